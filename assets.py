@@ -0,0 +1,98 @@
+'''
+Images and sounds of the game, loaded only once.
+
+Every Game (a new one is created on every settings change and every play again)
+and its Snake, Fruit and Settings take their assets from ASSETS, so the files are
+read from disk the first time only. The transformed (scaled and rotated) images are
+kept too, by (path, size, rotation), in a cache with a bounded number of them
+'''
+
+from collections import OrderedDict
+
+import pygame as pg
+
+
+class AssetManager:
+
+    '''
+    Lazy cache of the images and sounds of the game
+
+    ATTRIBUTES:
+
+        images :        original image of every path loaded
+        sounds :        sound of every path loaded
+        variants :      LRU cache of the transformed images, by (path, size, rotation)
+        max_variants :  max. number of images in variants
+        hits :          number of images found in variants
+        misses :        number of images which had to be transformed
+        evictions :     number of images removed from variants to make room
+
+    METHODS:
+
+        image :     returns an image, rotated and scaled
+        sound :     returns a sound
+    '''
+
+    def __init__(self, max_variants = 64):
+
+        self.images = {}
+        self.sounds = {}
+
+        self.variants = OrderedDict()
+        self.max_variants = max_variants
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def image(self, path, size = None, rotation = 0):
+
+        '''
+        Returns the image of path rotated (degrees, counterclockwise) and then
+        scaled to size (width, height). The same Surface is returned for the same
+        arguments, so it mustn't be modified
+
+        size : if None, the image keeps its size
+        '''
+
+        if size is not None:
+            size = (int(size[0]), int(size[1]))
+
+        key = (path, size, rotation)
+
+        if key in self.variants:
+            self.hits += 1
+            self.variants.move_to_end(key)
+            return self.variants[key]
+
+        self.misses += 1
+
+        if path not in self.images:
+            self.images[path] = pg.image.load(path)
+
+        image = self.images[path]
+
+        if rotation:
+            image = pg.transform.rotate(image, rotation)
+
+        if size is not None:
+            image = pg.transform.scale(image, size)
+
+        self.variants[key] = image
+
+        #Removing the least recently used image
+        if len(self.variants) > self.max_variants:
+            self.variants.popitem(last = False)
+            self.evictions += 1
+
+        return image
+
+    def sound(self, path):
+
+        if path not in self.sounds:
+            self.sounds[path] = pg.mixer.Sound(path)
+
+        return self.sounds[path]
+
+
+#Assets shared by every game
+ASSETS = AssetManager()
@@ -0,0 +1,95 @@
+'''
+Measures the latency of the pathfinder searches on every board size, and the
+number of nodes expanded per call by every search strategy (see SEARCHES in search.py).
+
+The board states are taken from real autopilot games (driven as in simulate.py),
+so the snake lengths go from the beginning to the end of a game.
+
+    python benchmark.py --states 200
+'''
+
+import argparse
+import random
+import time
+
+from engine import Engine, BOARD_SIZES
+from pathfinder import Pathfinder
+from search import SEARCHES
+
+
+def game_states(x_squares, y_squares, number_of_states, seed = 0):
+
+    '''
+    Returns a list of (snake, fruit position) pairs evenly sampled from a whole autopilot game
+    '''
+
+    states = []
+
+    random.seed(seed)
+    engine = Engine(x_squares, y_squares)
+    pathfinder = Pathfinder(x_squares, y_squares)
+
+    while engine.playing and engine.moves < 100 * x_squares * y_squares:
+
+        states.append((engine.snake.copy(), engine.fruit.positions[0]))
+
+        path = pathfinder.get_path(engine.snake, engine.fruit)
+        if not path:
+            break
+
+        engine.snake.direction = (path[0][0] - engine.snake.head[0], path[0][1] - engine.snake.head[1])
+        engine.step()
+
+    return states[::max(1, len(states) // number_of_states)][:number_of_states]
+
+
+def time_calls(function, states, repeat):
+
+    '''
+    Mean time (microseconds) of a call of function(snake, fruit_pos) over every state
+    '''
+
+    start = time.perf_counter()
+
+    for _ in range(repeat):
+        for snake, fruit_pos in states:
+            function(snake, fruit_pos)
+
+    return 1e6 * (time.perf_counter() - start) / (repeat * len(states))
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description = 'Latency of the pathfinder searches')
+    parser.add_argument('--states', type = int, default = 200)
+    parser.add_argument('--repeat', type = int, default = 20)
+    args = parser.parse_args()
+
+    print(f'{"board":<8}{"search":<15}{"to fruit (us)":>15}{"nodes":>8}{"to tail (us)":>15}{"nodes":>8}')
+
+    for size, (x_squares, y_squares) in BOARD_SIZES.items():
+
+        states = game_states(x_squares, y_squares, args.states)
+        calls = args.repeat * len(states)
+
+        for search in SEARCHES:
+
+            pathfinder = Pathfinder(x_squares, y_squares, search)
+
+            to_fruit = time_calls(lambda snake, fruit_pos: pathfinder.shortest_path(
+                snake.head, fruit_pos, snake), states, args.repeat)
+            fruit_nodes = pathfinder.search.total_expanded / calls
+
+            to_tail = time_calls(lambda snake, fruit_pos: pathfinder.path_to_tail(snake), states, args.repeat)
+            tail_nodes = pathfinder.search.total_expanded / calls - fruit_nodes
+
+            print(f'{size:<8}{search:<15}{to_fruit:>15.1f}{fruit_nodes:>8.1f}{to_tail:>15.1f}{tail_nodes:>8.1f}')
+
+        field = time_calls(lambda snake, fruit_pos: pathfinder.distance_field(snake), states, args.repeat)
+        field_nodes = pathfinder.field.total_expanded / calls
+
+        print(f'{size:<8}{"distance field":<15}{field:>15.1f}{field_nodes:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
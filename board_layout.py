@@ -0,0 +1,47 @@
+import pygame as pg
+from coord_transform import coordinate_transform
+
+class BoardLayout:
+
+    ''' Position of the game board in the window, computed once per game so the
+    drawings don't need any coordinate transformation (see coord_transform.py)
+
+    ATTRIBUTES:
+
+        cell_width :            the size of the cells in the game board
+        x_squares, y_squares :  number of squares in the game board in the X and Y directions
+        delta_x, delta_y :      translation from the game board frame to the window frame
+        cell_rects :            rectangle (window) of every cell index (x + y*x_squares)
+        rect :                  rectangle (window) of the whole board
+
+    METHODS:
+
+        to_window :     transforms a position in the game board frame (pixels) into the window frame
+        cell_rect :     returns the rectangle of a (x, y) cell
+    '''
+
+    def __init__(self, window_size, x_squares, y_squares, cell_width):
+
+        self.cell_width = cell_width
+        self.x_squares = x_squares
+        self.y_squares = y_squares
+
+        #The transformation is just a translation
+        self.delta_x, self.delta_y = coordinate_transform(0, 0, [window_size, x_squares, y_squares, cell_width])
+
+        #Left side of every column and top side of every row (window)
+        columns = [int(x * cell_width + self.delta_x) for x in range(x_squares)]
+        rows = [int(y * cell_width + self.delta_y) for y in range(y_squares)]
+
+        self.cell_rects = [pg.Rect(columns[x], rows[y], cell_width, cell_width)
+                           for y in range(y_squares) for x in range(x_squares)]
+
+        self.rect = pg.Rect(columns[0], rows[0], x_squares * cell_width, y_squares * cell_width)
+
+    def to_window(self, x, y):
+
+        return x + self.delta_x, y + self.delta_y
+
+    def cell_rect(self, cell):
+
+        return self.cell_rects[cell[0] + cell[1] * self.x_squares]
@@ -0,0 +1,566 @@
+'''
+Headless simulation core of the game.
+
+The engine only knows about cells: the snake body, the fruits and the rules
+of the game (motion, eating, dying and winning). It doesn't load images or
+sounds and never sleeps, so it can be driven by the pygame front end (main.py)
+or run on its own as fast as possible (simulate.py)
+'''
+
+from collections import deque
+from itertools import islice
+from random import Random, sample, choice
+
+#Number of cells (X, Y) of every board size
+BOARD_SIZES = {'BIG': (19, 17), 'MEDIUM': (12, 11), 'SMALL': (8, 8)}
+
+#Coordinate tables already computed, for every board size (X, Y)
+_CELL_COORDINATES = {}
+
+#Zobrist key tables already computed, for every board size (X, Y)
+_ZOBRIST_KEYS = {}
+
+
+def cell_coordinates(x_squares, y_squares):
+
+    '''
+    Returns a tuple with the (x, y) coordinates of every cell index (x + y*x_squares)
+    '''
+
+    key = (x_squares, y_squares)
+
+    if key not in _CELL_COORDINATES:
+        _CELL_COORDINATES[key] = tuple((index % x_squares, index // x_squares)
+                                       for index in range(x_squares * y_squares))
+
+    return _CELL_COORDINATES[key]
+
+
+def zobrist_keys(x_squares, y_squares):
+
+    '''
+    Returns the random 64-bit keys used to hash the game states of a board size:
+
+        head :  key of the head in every cell index
+        links : key of every block (but the head) in every cell index, depending on the
+                direction to the next block towards the head (4*cell + direction index)
+        fruit : key of a fruit in every cell index
+
+    The head and the links describe the whole body (not only the occupied cells), so two
+    snakes have the same hash only if they are equal. The keys come from their own
+    generator, so hashing doesn't change the random numbers of the game
+    '''
+
+    key = (x_squares, y_squares)
+
+    if key not in _ZOBRIST_KEYS:
+        generator = Random(x_squares * 1000 + y_squares)
+        cells = x_squares * y_squares
+
+        _ZOBRIST_KEYS[key] = tuple([generator.getrandbits(64) for _ in range(size)]
+                                   for size in (cells, 4 * cells, cells))
+
+    return _ZOBRIST_KEYS[key]
+
+
+def link_index(cell, next_cell, x_squares):
+
+    #Index of the key of a block in cell, followed (towards the head) by
+    # a block in next_cell: right, left, down, up
+    step = next_cell - cell
+
+    if step == 1:
+        return 4 * cell
+
+    if step == -1:
+        return 4 * cell + 1
+
+    return 4 * cell + (2 if step == x_squares else 3)
+
+
+class PlanningSnake:
+
+    ''' Compact snake with only what's needed to move it (no assets, no
+    game counters). The pathfinder uses copies of it for every lookahead.
+
+    The body is a deque of cell indices (x + y*x_squares), the head being the first one,
+    so moving and growing are O(1) whatever the length of the snake. The direction of
+    every block isn't stored: it's the difference between two consecutive cells
+
+    ATTRIBUTES:
+
+        x_squares, y_squares :  number of cells in the game board in the X and Y directions
+        coords :                (x, y) coordinates of every cell index (shared by every snake of the same board)
+        cells :                 deque containing the cell index of each block of the snake
+        occupancy :             flat grid (one byte per cell index) with the number
+                                of blocks of the snake in every cell, updated on every move
+        direction :             current direction of the snake head
+        last_tail :             cell index occupied by the tail before the last move
+        increase_body :         boolean to know whether the next move adds a new block
+        zobrist :               hash of the body (see zobrist_keys), updated on every move in O(1)
+
+    METHODS:
+
+        head, tail :    (x, y) cell of the head and of the tail
+        body :          list containing the (x, y) cell of each block of the snake (O(length))
+        move_snake :    moves the snake one cell in self.direction (and adds a new block when needed)
+        append_block :  adds a new block at the end of the body
+        copy :          returns a PlanningSnake with the same body, direction and occupancy
+        after_path :    returns the PlanningSnake obtained by following a path, computed in one operation
+        body_hash :     computes the hash of the body from scratch (O(length))
+    '''
+
+    __slots__ = ('x_squares', 'y_squares', 'coords', 'cells', 'occupancy',
+                 'direction', 'last_tail', 'increase_body', 'zobrist')
+
+    def __init__(self, x_squares, y_squares, body):
+
+        self.x_squares = x_squares
+        self.y_squares = y_squares
+        self.coords = cell_coordinates(x_squares, y_squares)
+
+        self.cells = deque(x + y * x_squares for x, y in body)
+        self.occupancy = bytearray(x_squares * y_squares)
+
+        for cell in self.cells:
+            self.occupancy[cell] += 1
+
+        self.direction = (0, 0)
+        self.last_tail = self.cells[-1]
+        self.increase_body = False
+        self.zobrist = self.body_hash()
+
+    @property
+    def head(self):
+
+        return self.coords[self.cells[0]]
+
+    @property
+    def tail(self):
+
+        return self.coords[self.cells[-1]]
+
+    @property
+    def body(self):
+
+        return [self.coords[cell] for cell in self.cells]
+
+    def move_snake(self):
+
+        '''
+        Moves the head one cell in self.direction (which must stay inside the board).
+        The tail follows the body unless self.increase_body is True, in which case
+        it stays in place and the snake grows one block
+        '''
+
+        head_keys, link_keys = zobrist_keys(self.x_squares, self.y_squares)[:2]
+
+        old_head = self.cells[0]
+        head = old_head + self.direction[0] + self.direction[1] * self.x_squares
+        self.cells.appendleft(head)
+        self.occupancy[head] += 1
+
+        #The old head becomes a block followed by the new head
+        self.zobrist ^= head_keys[old_head] ^ head_keys[head] ^ link_keys[
+            link_index(old_head, head, self.x_squares)]
+
+        if self.increase_body:
+            self.last_tail = self.cells[-1]
+            self.increase_body = False
+
+        else:
+            self.last_tail = self.cells.pop()
+            self.occupancy[self.last_tail] -= 1
+            self.zobrist ^= link_keys[link_index(self.last_tail, self.cells[-1], self.x_squares)]
+
+    def append_block(self, cell):
+
+        #Adding a new block (cell index) behind the tail
+        link_keys = zobrist_keys(self.x_squares, self.y_squares)[1]
+        self.zobrist ^= link_keys[link_index(cell, self.cells[-1], self.x_squares)]
+
+        self.cells.append(cell)
+        self.occupancy[cell] += 1
+
+    def copy(self):
+
+        '''
+        Copies the parameters associated with the motion of the snake. No
+        constructor is called: only the body and the grid are copied
+        '''
+
+        snake_copy = PlanningSnake.__new__(PlanningSnake)
+        snake_copy.x_squares = self.x_squares
+        snake_copy.y_squares = self.y_squares
+        snake_copy.coords = self.coords
+        snake_copy.cells = self.cells.copy()
+        snake_copy.occupancy = self.occupancy[:]
+        snake_copy.direction = self.direction
+        snake_copy.last_tail = self.last_tail
+        snake_copy.increase_body = self.increase_body
+        snake_copy.zobrist = self.zobrist
+
+        return snake_copy
+
+    def after_path(self, path, growth = 0):
+
+        '''
+        Returns a new PlanningSnake equal to this one after following path (a list of
+        (x, y) cells, from the first step), without moving it step by step.
+
+        growth : number of blocks added on the way (e.g. fruits eaten, at most one per step). The
+                 last step is one of them when growth > 0, as when the path ends at a fruit
+
+        EXTRA COMMENTS : the body is always made of the last cells visited by the head, so
+            the new body is the path (reversed) followed by the old body, cut at the new length.
+            It costs O(length), no matter how long the path is.
+        '''
+
+        length = len(self.cells) + growth
+        x_squares = self.x_squares
+
+        #Cells visited by the head, from the last one (new head)
+        path_cells = [x + y * x_squares for x, y in reversed(path)]
+
+        cells = deque(path_cells[:length])
+        cells.extend(islice(self.cells, 0, length - len(cells)))
+
+        #Cell of the tail before the last move, as in move_snake: the tail
+        # itself if the snake grew, otherwise the one right after it in the
+        # sequence of visited cells
+        if not path_cells:
+            last_tail = self.last_tail
+
+        elif growth:
+            last_tail = cells[-1]
+
+        elif length < len(path_cells):
+            last_tail = path_cells[length]
+
+        else:
+            last_tail = self.cells[length - len(path_cells)]
+
+        snake_copy = PlanningSnake.__new__(PlanningSnake)
+        snake_copy.x_squares = x_squares
+        snake_copy.y_squares = self.y_squares
+        snake_copy.coords = self.coords
+        snake_copy.cells = cells
+        snake_copy.occupancy = bytearray(len(self.occupancy))
+        snake_copy.last_tail = last_tail
+        snake_copy.increase_body = False
+
+        for cell in cells:
+            snake_copy.occupancy[cell] += 1
+
+        #Direction of the last step
+        if len(cells) > 1:
+            head, neck = self.coords[cells[0]], self.coords[cells[1]]
+            snake_copy.direction = (head[0] - neck[0], head[1] - neck[1])
+
+        else:
+            snake_copy.direction = self.direction
+
+        snake_copy.zobrist = snake_copy.body_hash()
+
+        return snake_copy
+
+    def body_hash(self):
+
+        head_keys, link_keys = zobrist_keys(self.x_squares, self.y_squares)[:2]
+
+        #Key of the head, and of every other block with the block that follows it
+        zobrist = head_keys[self.cells[0]]
+
+        for next_cell, cell in zip(self.cells, islice(self.cells, 1, None)):
+            zobrist ^= link_keys[link_index(cell, next_cell, self.x_squares)]
+
+        return zobrist
+
+
+class SnakeState(PlanningSnake):
+
+    ''' Logical snake of a game: a PlanningSnake with the counters used by the game rules
+
+    ATTRIBUTES:
+
+        new_direction :         next direction of the snake head (provided by the user or the pathfinder)
+        moves_without_eating :  the number of cells that snake has moved without eating
+    '''
+
+    def __init__(self, x_squares, y_squares):
+
+        super().__init__(x_squares, y_squares, [(5, 4), (4, 4), (3, 4)])
+
+        self.new_direction = (0, 0)
+        self.moves_without_eating = 0
+
+
+class FreeCells:
+
+    ''' Index of the free cells of the board (neither the snake nor the fruits are there),
+    kept up to date on every move so a new fruit is placed in O(1)
+
+    ATTRIBUTES:
+
+        x_squares :     number of cells in the game board in the X direction
+        cells :         list with the index (x + y*x_squares) of every free cell, in no particular order
+        slots :         position of every cell index in self.cells (-1 if the cell isn't free)
+
+    METHODS:
+
+        add :       adds a free cell in O(1)
+        remove :    removes a cell (if it's there) in O(1), moving the last cell of the list into its slot
+        choice :    returns a random free cell, as a (x, y) cell
+        sample :    returns k different random free cells, as (x, y) cells
+    '''
+
+    def __init__(self, x_squares, y_squares, occupancy):
+
+        self.x_squares = x_squares
+
+        #Same order as the positions built by FruitState.new_pos
+        self.cells = [i + j * x_squares for i in range(x_squares) for j in range(y_squares)
+                      if not occupancy[i + j * x_squares]]
+        self.slots = [-1] * (x_squares * y_squares)
+
+        for slot, cell in enumerate(self.cells):
+            self.slots[cell] = slot
+
+    def __len__(self):
+
+        return len(self.cells)
+
+    def add(self, cell):
+
+        if self.slots[cell] < 0:
+            self.slots[cell] = len(self.cells)
+            self.cells.append(cell)
+
+    def remove(self, cell):
+
+        slot = self.slots[cell]
+
+        if slot < 0:
+            return
+
+        #Swap-remove: the last cell takes the slot of the removed one
+        last = self.cells.pop()
+
+        if last != cell:
+            self.cells[slot] = last
+            self.slots[last] = slot
+
+        self.slots[cell] = -1
+
+    def choice(self):
+
+        cell = choice(self.cells)
+        return (cell % self.x_squares, cell // self.x_squares)
+
+    def sample(self, k):
+
+        return [(cell % self.x_squares, cell // self.x_squares) for cell in sample(self.cells, k)]
+
+
+class FruitState:
+
+    ''' Logical fruits
+
+    ATTRIBUTES :
+
+        number_of_fruits :  number of pieces of fruit used in the game
+        positions :         a list storing the (x, y) cell of every fruit
+        zobrist :           hash of the fruit positions (see zobrist_keys), updated when they change
+        x_squares :         number of cells of the board in the X direction (known after the first new_pos)
+        fruit_keys :        Zobrist key of a fruit in every cell index
+
+    METHODS :
+
+        new_pos :       calculates a new (possible) random position for the food
+        new_pos_from :  chooses the new position(s) in a FreeCells index (O(1) per fruit)
+        remove_fruit :  removes the fruit at a corresponding index
+        fruit_key :     returns the Zobrist key of a fruit in a (x, y) cell
+    '''
+
+    def __init__(self, num_fruits):
+
+        self.number_of_fruits = num_fruits
+        self.positions = []
+
+        self.zobrist = 0
+        self.x_squares = None
+        self.fruit_keys = None
+
+    def new_pos(self, snake, X_SQUARES, Y_SQUARES, free_cells = None):
+
+        '''
+        free_cells : FreeCells index of the board (with the current fruits already removed). If it's
+                     given the new position is chosen in O(1), otherwise every cell of the board is checked
+        '''
+
+        self.x_squares = X_SQUARES
+        self.fruit_keys = zobrist_keys(X_SQUARES, Y_SQUARES)[2]
+
+        if free_cells is not None:
+            self.new_pos_from(free_cells, len(snake.cells))
+            return
+
+        #List of all positions on the game board not
+        # occupied by the snake body
+        all_positions = [(i, j) for i in range(X_SQUARES) for j in range(Y_SQUARES)
+                         if not snake.occupancy[i + j * X_SQUARES]]
+
+        #Used only at the beggining of the game
+        if len(self.positions) == 0 and len(snake.cells) < 4:
+            self.positions = sample(all_positions, self.number_of_fruits)
+
+            self.zobrist = 0
+            for fruit_pos in self.positions:
+                self.zobrist ^= self.fruit_key(fruit_pos)
+
+        else:
+            #Removing the positions occupied by other fruits
+            for fruit_pos in self.positions:
+                all_positions.remove(fruit_pos)
+
+            #If there are no possible positions, we don't
+            # add more fruit
+            if len(all_positions) == 0:
+                self.number_of_fruits -= 1
+
+            else:
+                self.positions.append(choice(all_positions))
+                self.zobrist ^= self.fruit_key(self.positions[-1])
+
+    def new_pos_from(self, free_cells, snake_length):
+
+        #Used only at the beggining of the game
+        if len(self.positions) == 0 and snake_length < 4:
+            new_positions = free_cells.sample(self.number_of_fruits)
+
+        #If there are no possible positions, we don't
+        # add more fruit
+        elif len(free_cells) == 0:
+            self.number_of_fruits -= 1
+            return
+
+        else:
+            new_positions = [free_cells.choice()]
+
+        for fruit_pos in new_positions:
+            self.positions.append(fruit_pos)
+            self.zobrist ^= self.fruit_key(fruit_pos)
+            free_cells.remove(fruit_pos[0] + fruit_pos[1] * self.x_squares)
+
+    def remove_fruit(self, index):
+
+        #Remove the fruit at 'index' positions
+        self.zobrist ^= self.fruit_key(self.positions.pop(index))
+
+    def fruit_key(self, fruit_pos):
+
+        return self.fruit_keys[fruit_pos[0] + fruit_pos[1] * self.x_squares]
+
+
+class Engine:
+
+    '''
+    Applies the rules of the game to a snake and its fruits, one cell at a time
+
+    ATTRIBUTES:
+
+        x_squares, y_squares :  number of cells in the game board in the X and Y directions
+        snake :                 SnakeState object (or any subclass, like the pygame Snake)
+        fruit :                 FruitState object (or any subclass, like the pygame Fruit)
+        playing :               boolean to know if the game continues or not
+        won :                   boolean to know if the player's got the max. score
+        moves :                 number of cells moved since the beginning of the game
+        free_cells :            FreeCells index of the cells without snake nor fruit, updated on every step
+
+    METHODS:
+
+        step :          moves the snake one cell and applies the rules of the game
+        snake_dead :    checks if the snake collides with itself
+        game_won :      checks if the player's got the max. score
+    '''
+
+    def __init__(self, x_squares, y_squares, num_fruits = 1, snake = None, fruit = None):
+
+        self.x_squares = x_squares
+        self.y_squares = y_squares
+
+        self.snake = snake if snake is not None else SnakeState(x_squares, y_squares)
+        self.fruit = fruit if fruit is not None else FruitState(num_fruits)
+
+        self.free_cells = FreeCells(x_squares, y_squares, self.snake.occupancy)
+        for x, y in self.fruit.positions:
+            self.free_cells.remove(x + y * x_squares)
+
+        self.fruit.new_pos(self.snake, self.x_squares, self.y_squares, self.free_cells)
+
+        self.playing = True
+        self.won = False
+        self.moves = 0
+
+    def step(self):
+
+        '''
+        Moves the snake one cell in its current direction, handling the
+        fruit collisions (a.k.a eating), the death of the snake and the victory
+
+        RETURN : a tuple of booleans (ate, dead, won) describing what happened in this step
+        '''
+
+        snake = self.snake
+
+        #Checking if the snake is about to collide with the borders,
+        # in which case it doesn't move
+        head_x, head_y = snake.head
+        next_head = (head_x + snake.direction[0], head_y + snake.direction[1])
+
+        if not (0 <= next_head[0] < self.x_squares and 0 <= next_head[1] < self.y_squares):
+            self.playing = False
+            return False, True, False
+
+        #Checking if the snake is about to eat a fruit, so
+        # its tail stays in place
+        ate = next_head in self.fruit.positions
+
+        if ate:
+            snake.increase_body = True
+
+        snake.move_snake()
+        snake.moves_without_eating += 1
+
+        #The head cell isn't free anymore, and the old tail cell is (unless the snake grew)
+        self.free_cells.remove(snake.cells[0])
+        if not snake.occupancy[snake.last_tail]:
+            self.free_cells.add(snake.last_tail)
+        self.moves += 1
+
+        dead = self.snake_dead()
+
+        if ate and not dead:
+            self.fruit.remove_fruit(self.fruit.positions.index(next_head))
+            self.fruit.new_pos(snake, self.x_squares, self.y_squares, self.free_cells)
+            snake.moves_without_eating = 0
+
+        won = not dead and self.game_won()
+
+        if dead or won:
+            self.playing = False
+            self.won = won
+
+        return ate, dead, won
+
+    def snake_dead(self):
+
+        #Checking if the snake collides with its body (the
+        # head cell is occupied by another block)
+        return self.snake.occupancy[self.snake.cells[0]] > 1
+
+    def game_won(self):
+
+        #There are no places to add more fruits, so
+        # player has obtained max score
+        return self.fruit.number_of_fruits == 0
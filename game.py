@@ -1,25 +1,44 @@
 import pygame as pg
-from pygame.math import Vector2
 import itertools
 
+#NumPy is only needed by the 'pixels' renderer
+try:
+    import numpy as np
+
+except ImportError:
+    np = None
+
+from engine import Engine, BOARD_SIZES
 from snake import Snake
 from fruit import Fruit
 from pathfinder import Pathfinder
+from hamiltonian import HamiltonianPathfinder
 from button import Button
 from dimmer import Dimmer
 from settings import Settings
+from assets import ASSETS
 
-from coord_transform import coordinate_transform
+from board_layout import BoardLayout
 from colors import COLORS
 
 game_font = pg.font.SysFont('comicsans', 45)
 
 game_variables = {'FAST' : 85, 'NORMAL': 65, 'SLOW': 50,
- 'BIG': [19, 17], 'MEDIUM': [12, 11], 'SMALL': [8, 8],
+ 'BIG': BOARD_SIZES['BIG'], 'MEDIUM': BOARD_SIZES['MEDIUM'], 'SMALL': BOARD_SIZES['SMALL'],
   'THREE': 3, 'TWO': 2, 'ONE': 1,
    'RED_MAP': ['RED', 'WHITE'], 'GREEN_MAP': ['GREEN', 'DARK_GREEN'], 'BLUE_MAP': ['BLUE', 'LIGHT_BLUE'],
    'YELLOW': 'YELLOW', 'RED': 'RED', 'BLUE': 'BLUE',
-   'YES': True, 'NO': False}
+   'YES': True, 'NO': False, 'CYCLE': True}
+
+#Speed added to the game speed when using autopilot
+AUTOPILOT_SPEED = 80
+
+#Max. number of frames drawn per second (the speed of the game doesn't depend on it)
+MAX_FPS = 120
+
+#Longest time (seconds) simulated in a frame, so the game doesn't try
+# to catch up after a pause (e.g. the delays when the game ends)
+MAX_FRAME_TIME = 0.25
 
 class Game:
 
@@ -37,8 +56,12 @@ class Game:
         _ IMAGES :              some images in the game
         snake :                 Snake object
         fruit :                 Fruit object
-        pathfinder :            Pathfinder algorithm
-        fruit.new_pos :         sets up a random position for the fruit(s)
+        engine :                Engine object that applies the rules of the game to snake and fruit
+        pathfinder :            Pathfinder algorithm (HamiltonianPathfinder if the CYCLE option is chosen),
+                                using the search strategy given by search (see SEARCHES in search.py). Every
+                                new plan has a time budget of half a frame at MAX_FPS (see budgeted_path)
+        tick_time :             time (seconds) taken by the snake to move one cell, which depends on the speed option
+        accumulator :           time (seconds) not simulated yet, less than tick_time after every update
         play_again_object :     a button object associated with PLAY_AGAIN_IMAGE
         exit_button :           a button object associated with the EXIT_IMAGE
         settings :              a Settings object
@@ -46,21 +69,37 @@ class Game:
         playing :               boolean to know if the game continues or not
         display_settings :      boolean to know if displaying the settings or not
         victory :               a sound played when you win the game
+        layout :                BoardLayout object with the position of every cell of the board in the window
+        background :            Surface with the background of the window and the game board grid
+        full_redraw :           boolean to know if the next draw_dirty must redraw the whole window
+        dirty_rects :           regions of the window where the snake drawing changes in the current step
+        dirty_moves :           number of moves of the engine when dirty_rects was computed
+        drawn_score :           score displayed in the window
+        renderer :              'sprites' (images and squares) or 'pixels' (one pixel per cell, see draw_pixels)
+        board_colors :          ('pixels' renderer) color of every cell index of the empty board (NumPy array)
+        cell_colors :           ('pixels' renderer) color of every cell index in the current frame
+        cell_surface :          ('pixels' renderer) Surface with one pixel per cell
+        board_surface :         ('pixels' renderer) cell_surface scaled to the size of the board
+        pixel_colors :          ('pixels' renderer) colors of the snake body, the snake head and the fruits
 
     METHODS:
 
         draw_window :       calls every drawing method7
-        draw_grid :         draws a grid of a specific color and size
-        fruit_collision :   handles the collisions with the fruits (a.k.a eating)
-        snake_dead :        checks if the snake collides with the borders or itself
-        game_won :          checks if the player's got the max. score
+        draw_grid :         draws the background of the window, with the game board grid
+        render_background : renders the background once, in a Surface (see background)
+        draw_dirty :        redraws only the regions of the window that change and returns them
+        init_pixels :       prepares the arrays and surfaces of the 'pixels' renderer
+        draw_pixels :       draws the board with one pixel per cell, scaled to the board size
+        dirty_cells :       returns the cells of the board where the snake drawing changes in the current step
+        cell_rect :         returns the rectangle around a cell of the game board
         ending :            displays a little menu to know if playing again or ending the game
-        update :            updates every game event and dynamics
+        update :            advances the time of the game, running the ticks due (fixed timestep)
+        tick :              chooses the direction and moves the snake one cell (using the engine), playing the sounds
         draw_score :        draws the current score of the player
 
     '''
 
-    def __init__(self, WINDOW, variables):
+    def __init__(self, WINDOW, variables, search = 'bfs', renderer = 'sprites'):
 
         self.game_variables = [game_variables[variable] for variable in variables]
         self.WINDOW = WINDOW
@@ -70,15 +109,21 @@ class Game:
             (self.WINDOW_SIZE - 50) /(self.Y_SQUARES + 1)))
         self.autopilot = self.game_variables[-1]
 
-        self.SCORE_IMAGE = pg.transform.scale(pg.image.load('images/food_image.png'), (55, 55))
-        self.PLAY_AGAIN_IMAGE = pg.transform.scale(pg.image.load('images/play_again.png'), (150, 90))
-        self.EXIT_IMAGE = pg.transform.scale(pg.image.load('images/exit.png'), (165, 100))
-        self.SETTINGS_IMAGE = pg.transform.scale(pg.image.load('images/settings.png'), (60, 60))
+        #Every image and sound is loaded only once (see assets.py)
+        self.SCORE_IMAGE = ASSETS.image('images/food_image.png', (55, 55))
+        self.PLAY_AGAIN_IMAGE = ASSETS.image('images/play_again.png', (150, 90))
+        self.EXIT_IMAGE = ASSETS.image('images/exit.png', (165, 100))
+        self.SETTINGS_IMAGE = ASSETS.image('images/settings.png', (60, 60))
 
-        self.snake = Snake(self.game_variables[4], self.CELL_WIDTH)
+        self.snake = Snake(self.game_variables[4], self.CELL_WIDTH, self.X_SQUARES, self.Y_SQUARES)
         self.fruit = Fruit(self.game_variables[2], self.CELL_WIDTH)
-        self.pathfinder = Pathfinder(self.X_SQUARES, self.Y_SQUARES, self.CELL_WIDTH)
-        self.fruit.new_pos(self.snake.body, self.X_SQUARES, self.Y_SQUARES)
+        self.engine = Engine(self.X_SQUARES, self.Y_SQUARES, snake = self.snake, fruit = self.fruit)
+        if variables[-1] == 'CYCLE':
+            self.pathfinder = HamiltonianPathfinder(self.X_SQUARES, self.Y_SQUARES)
+
+        else:
+            time_budget = 500 / MAX_FPS
+            self.pathfinder = Pathfinder(self.X_SQUARES, self.Y_SQUARES, search, time_budget = time_budget)
 
         self.play_again_button = Button(self.PLAY_AGAIN_IMAGE)
         self.exit_button = Button(self.EXIT_IMAGE)
@@ -88,7 +133,27 @@ class Game:
         self.playing = True
         self.display_settings = False
 
-        self.victory = pg.mixer.Sound('sounds/victory.wav')
+        self.victory = ASSETS.sound('sounds/victory.wav')
+
+        #Position of the board in the window
+        self.layout = BoardLayout(self.WINDOW_SIZE, self.X_SQUARES, self.Y_SQUARES, self.CELL_WIDTH)
+
+        #The options can only change with a new game, so the background is rendered once
+        self.background = self.render_background()
+
+        self.full_redraw = True
+        self.dirty_rects = []
+        self.dirty_moves = -1
+        self.drawn_score = None
+
+        #The snake moves cell_division frames per cell at the speed option (as FPS)
+        speed = self.game_variables[0] + (AUTOPILOT_SPEED if self.autopilot else 0)
+        self.tick_time = self.snake.cell_division / speed
+        self.accumulator = 0
+
+        self.renderer = renderer
+        if self.renderer == 'pixels':
+            self.init_pixels()
 
     def draw_window(self):
 
@@ -96,86 +161,198 @@ class Game:
         Calls all the drawing methods
         '''
 
-        #Constants to compute the coordinate transformation
-        args = [self.WINDOW_SIZE, self.X_SQUARES, self.Y_SQUARES, self.CELL_WIDTH]
-
         self.draw_grid()
-        self.fruit.draw_fruit(self.WINDOW,self.CELL_WIDTH, coordinate_transform, args)
-        self.snake.draw_snake(self.WINDOW, coordinate_transform, args)
+
+        if self.renderer == 'pixels':
+            self.draw_pixels()
+
+        else:
+            self.fruit.draw_fruit(self.WINDOW, self.layout)
+            self.snake.draw_snake(self.WINDOW, self.layout)
+
         self.draw_score(20, 0)
         self.settings.settings_button.draw(self.WINDOW, False)
 
-    def draw_grid(self):
+    def draw_dirty(self):
 
-        #Constants to compute the coordinate transformation
-        args = [self.WINDOW_SIZE, self.X_SQUARES, self.Y_SQUARES, self.CELL_WIDTH]
+        '''
+        Draws a frame of the game redrawing only the regions that change: the head, the
+        tail and the corners of the snake (see Snake.changing_cells), the fruits, and the
+        score when it changes. The regions are restored from the background and the fruits
+        and the snake are drawn over them. The snake doesn't change anywhere else, so drawing
+        it again there paints the same pixels. The first frame draws the whole window.
 
-        #Background
-        self.WINDOW.fill(COLORS['DARK_GREY'])
-        upper_rect = pg.Rect(0, 0, self.WINDOW_SIZE, 50)
-        pg.draw.rect(self.WINDOW, COLORS['LIGHT_GREY'], upper_rect)
+        The 'pixels' renderer redraws the whole board, which is as cheap as a few cells
 
-        #Colors of the grid
-        grid_color =  itertools.cycle((
+        RETURN : the list of rectangles that changed, for pg.display.update
+        '''
+
+        #Regions of the current step (the ones of the last frame are erased too)
+        last_rects = self.dirty_rects
+
+        if self.engine.moves != self.dirty_moves and self.renderer != 'pixels':
+
+            #After several moves in a frame (slow frames) the cells in
+            # between changed too, so the whole window is drawn
+            if self.engine.moves - self.dirty_moves > 1:
+                self.full_redraw = True
+
+            self.dirty_rects = [self.cell_rect(cell) for cell in self.dirty_cells()]
+            self.dirty_moves = self.engine.moves
+
+        if self.full_redraw:
+            self.full_redraw = False
+            self.drawn_score = len(self.snake.cells) - 3
+            self.draw_window()
+            return [self.WINDOW.get_rect()]
+
+        if self.renderer == 'pixels':
+            self.draw_pixels()
+            rects = [self.layout.rect]
+
+        else:
+            rects = [self.cell_rect(fruit_pos) for fruit_pos in self.fruit.positions]
+            rects += self.dirty_rects
+
+            if last_rects is not self.dirty_rects:
+                rects += last_rects
+
+            for rect in rects:
+                self.WINDOW.blit(self.background, rect, rect)
+
+            self.fruit.draw_fruit(self.WINDOW, self.layout)
+            self.snake.draw_snake(self.WINDOW, self.layout)
+
+        #Score (in the upper bar, away from the board)
+        if len(self.snake.cells) - 3 != self.drawn_score:
+            self.drawn_score = len(self.snake.cells) - 3
+
+            score_rect = pg.Rect(0, 0, 300, 60)
+            self.WINDOW.blit(self.background, score_rect, score_rect)
+            self.draw_score(20, 0)
+            rects.append(score_rect)
+
+        return rects
+
+    def init_pixels(self):
+
+        '''
+        Prepares the 'pixels' renderer: the colors of the empty board (the same
+        checkerboard as render_background) and the surfaces used on every frame
+        '''
+
+        if np is None:
+            raise ImportError("The 'pixels' renderer needs NumPy")
+
+        #Colors of the grid, in the same order as render_background
+        grid_color = itertools.cycle((
             COLORS[self.game_variables[3][0]], COLORS[self.game_variables[3][1]]))
 
-        #Creating the grid
-        for i in range(0, self.X_SQUARES*self.CELL_WIDTH, self.CELL_WIDTH):
-            for j in range(0, self.Y_SQUARES*self.CELL_WIDTH, self.CELL_WIDTH):
-                xi, yj = coordinate_transform(i, j, args)
-                rect = pg.Rect(xi, yj, self.CELL_WIDTH, self.CELL_WIDTH)
-                pg.draw.rect(self.WINDOW, next(grid_color), rect)    #Alternating between the 2 colors
+        self.board_colors = np.zeros((self.X_SQUARES * self.Y_SQUARES, 3), dtype = np.uint8)
+
+        for x in range(self.X_SQUARES):
+            for y in range(self.Y_SQUARES):
+                self.board_colors[x + y * self.X_SQUARES] = next(grid_color)
 
             if self.Y_SQUARES % 2 == 0:
                 next(grid_color)
 
-    def fruit_collision(self):
+        self.cell_colors = self.board_colors.copy()
+        self.cell_surface = pg.Surface((self.X_SQUARES, self.Y_SQUARES))
+        self.board_surface = pg.Surface(self.layout.rect.size).convert()
+
+        #The head is darker than the body, and the fruits have the mean color of their image
+        snake_color = COLORS[self.snake.snake_color]
+        self.pixel_colors = {'body': snake_color, 'head': tuple(value // 2 for value in snake_color),
+                             'fruit': tuple(pg.transform.average_color(self.fruit.fruit_IMAGE, consider_alpha = True))[:3]}
+
+    def draw_pixels(self):
+
+        '''
+        Draws the board (grid, snake and fruits) writing one pixel per cell in an array
+        (pygame.surfarray), which is then scaled to the size of the board with a single blit.
+        The cost depends on the size of the window, not on the number of cells or blocks.
+        The snake moves a whole cell at a time
+        '''
+
+        colors = self.cell_colors
+        colors[:] = self.board_colors
+
+        cells = np.fromiter(self.snake.cells, dtype = np.intp, count = len(self.snake.cells))
+        colors[cells] = self.pixel_colors['body']
+        colors[cells[0]] = self.pixel_colors['head']
+
+        for x, y in self.fruit.positions:
+            colors[x + y * self.X_SQUARES] = self.pixel_colors['fruit']
+
+        #Cell indices are x + y*X_SQUARES, while surfarray uses [x, y]
+        pg.surfarray.blit_array(self.cell_surface, colors.reshape(self.Y_SQUARES, self.X_SQUARES, 3).transpose(1, 0, 2))
+
+        pg.transform.scale(self.cell_surface, self.layout.rect.size, self.board_surface)
+        self.WINDOW.blit(self.board_surface, self.layout.rect)
+
+    def dirty_cells(self):
+
+        '''
+        Cells where the snake drawing changes in the current step: every cell inside the
+        box of a group of Snake.changing_cells (at a corner, the squares between two blocks
+        go into the fourth cell of the box). Every cell is only once, so nothing is drawn twice
+        '''
+
+        cells = set()
+
+        for group in self.snake.changing_cells():
+            xs = [x for x, _ in group]
+            ys = [y for _, y in group]
+
+            cells.update((x, y) for x in range(min(xs), max(xs) + 1) for y in range(min(ys), max(ys) + 1))
+
+        return cells
+
+    def cell_rect(self, cell):
 
         '''
-        Checks if the snake collides with a fruit (snake eats a fruit)
-        
+        Rectangle of the window around a (x, y) cell of the game board
+        (with a pixel of margin for the rounding of the drawings)
         '''
 
-        #Iterating through every fruit
-        for i, pos in enumerate(self.fruit.positions):
+        return self.layout.cell_rect(cell).inflate(2, 2)
 
-            #If both positions coincide, the snake
-            #has eaten the fruit and so we incrase its length
-            if self.snake.body[0] == pos:
-                self.snake.new_block = Vector2(self.snake.body[-1]) #Storing position of the tail
-                self.fruit.remove_fruit(i)
-                self.snake.increase_body = True
-                self.snake.eating_sound.play()
-                self.fruit.new_pos(self.snake.body, self.X_SQUARES, self.Y_SQUARES)
-                self.snake.moves_without_eating = 0
+    def draw_grid(self):
 
-    def snake_dead(self):
+        #The background never changes during a game
+        self.WINDOW.blit(self.background, (0, 0))
 
-        dead = False
+    def render_background(self):
 
-        #Checking if the snake is collides with borders
-        if not -0.3 < round(self.snake.body[0].x, 3) < self.X_SQUARES - 0.7 or not -0.3 < round(
-            self.snake.body[0].y, 3) < self.Y_SQUARES - 0.7:
-            dead = True
+        '''
+        Renders the background of the window (upper bar and game board grid) once,
+        so every frame only blits it, whatever the size of the board
 
-        #Checking if the snake is collides with its body
-        for body_block in self.snake.body[1:]:
-            if body_block == self.snake.body[0]:
-                dead = True
+        RETURN : a Surface of the size of the window
+        '''
 
-        if dead:
-            self.snake.hit_sound.play()
-            pg.time.delay(2000)
-            self.playing = False
+        background = pg.Surface((self.WINDOW_SIZE, self.WINDOW_SIZE)).convert()
 
-    def game_won(self):
+        #Background
+        background.fill(COLORS['DARK_GREY'])
+        upper_rect = pg.Rect(0, 0, self.WINDOW_SIZE, 50)
+        pg.draw.rect(background, COLORS['LIGHT_GREY'], upper_rect)
 
-        #There are no places to add more fruits, so
-        # player has obtained max score
-        if self.fruit.number_of_fruits == 0:
-            self.victory.play()
-            pg.time.delay(3000)
-            self.playing = False
+        #Colors of the grid
+        grid_color =  itertools.cycle((
+            COLORS[self.game_variables[3][0]], COLORS[self.game_variables[3][1]]))
+
+        #Creating the grid
+        for x in range(self.X_SQUARES):
+            for y in range(self.Y_SQUARES):
+                rect = self.layout.cell_rect((x, y))
+                pg.draw.rect(background, next(grid_color), rect)    #Alternating between the 2 colors
+
+            if self.Y_SQUARES % 2 == 0:
+                next(grid_color)
+
+        return background
 
     def ending(self):
         '''
@@ -183,14 +360,12 @@ class Game:
         Also shows the score obtainded by the player
         '''
 
-        args = [self.WINDOW_SIZE, self.X_SQUARES, self.Y_SQUARES, self.CELL_WIDTH]
-
         #Darkening the background self.WINDOW
         self.dim.dim()
 
         #Setting the position and size of the WINDOW
         WIDTH, HEIGHT = self.X_SQUARES*self.CELL_WIDTH, self.Y_SQUARES*self.CELL_WIDTH
-        center = coordinate_transform(WIDTH/2, 0.8*HEIGHT/2, args)
+        center = self.layout.to_window(WIDTH/2, 0.8*HEIGHT/2)
         rect = pg.Rect(0, 0, WIDTH/ 2.1, HEIGHT / 3)
         rect.center = (center)
         pg.draw.rect(self.WINDOW, COLORS['LIGHT_GREY'], rect)
@@ -220,14 +395,57 @@ class Game:
 
         return play_again, exit
 
-    def update(self):
+    def update(self, elapsed):
+
+        '''
+        Advances the game elapsed seconds (the time of the last frame). The snake moves one
+        cell every tick_time seconds whatever the FPS: a slow frame runs several ticks and a
+        fast one may run none. The remaining time sets how far the snake is drawn between
+        its last cell and the current one (Snake.progress)
+        '''
+
+        self.accumulator += min(elapsed, MAX_FRAME_TIME)
+
+        while self.accumulator >= self.tick_time and self.playing:
+            self.accumulator -= self.tick_time
+            self.tick()
+
+        #The snake is drawn at the centre of the cells until it moves (and when the game ends)
+        self.snake.progress = min(self.accumulator / self.tick_time, 1) if self.engine.moves else 1
+
+    def tick(self):
+
+        snake = self.snake
+
+        #Autopilot case: the direction is given by the pathfinder
+        if self.autopilot:
+            path = self.pathfinder.get_path(snake, self.fruit)
+
+            if path:
+
+                #Directions to move the snake to the neighbor location
+                snake.new_direction = (path[0][0] - snake.head[0], path[0][1] - snake.head[1])
+
+        #The snake can only move to a new direction at the centre of a cell
+        snake.direction = snake.new_direction
 
         #Waiting until the snake moves
-        if self.snake.direction != (0,0):
-            self.snake.move_snake()
-            self.fruit_collision()
-            self.snake_dead()
-            self.game_won()
+        if snake.direction != (0,0):
+
+            ate, dead, won = self.engine.step()
+
+            if ate:
+                snake.eating_sound.play()
+
+            if dead:
+                snake.hit_sound.play()
+                pg.time.delay(2000)
+
+            if won:
+                self.victory.play()
+                pg.time.delay(3000)
+
+            self.playing = self.engine.playing
 
     def draw_score(self, x, y):
 
@@ -238,7 +456,7 @@ class Game:
 
         '''
         #Score text (fruits eaten)
-        score_text = str(len(self.snake.body) - 3)
+        score_text = str(len(self.snake.cells) - 3)
         score_surface = game_font.render(score_text, 1, COLORS['BLACK'])
         self.WINDOW.blit(score_surface, (x + 60, y - 3))
 
@@ -0,0 +1,161 @@
+'''
+Autopilot based on a Hamiltonian cycle of the game board.
+
+The snake follows a cycle that visits every cell of the board, so it can never
+collide with itself. To get to the fruits faster it takes shortcuts (jumps
+forward in the cycle) only when they are provably safe: the body always stays
+inside the part of the cycle between the tail and the head.
+
+When both sides of the board are odd there's no Hamiltonian cycle, so the cycle
+visits every cell but one. The cell left out (spare) can be swapped with a
+cell of the cycle (partner) that has the same two cycle neighbors, which lets
+the snake reach a fruit in any cell and fill the whole board.
+'''
+
+from search import neighbor_table
+
+
+def hamiltonian_cycle(x_squares, y_squares):
+
+    '''
+    Builds a cycle on the game board (a list of (x, y) cells).
+
+    The rows are visited back and forth (from x = 1) and the snake comes back through
+    the column x = 0. If both sides are odd, the last row is visited by small
+    detours from the row above, and the cell (0, y_squares - 1) is left out.
+
+    RETURN : cycle, spare, partner (spare and partner are None if the cycle visits every cell)
+    '''
+
+    #Visiting columns instead of rows
+    if y_squares % 2 == 1 and x_squares % 2 == 0:
+        cycle = hamiltonian_cycle(y_squares, x_squares)[0]
+        return [(y, x) for x, y in cycle], None, None
+
+    rows = y_squares if y_squares % 2 == 0 else y_squares - 1
+    last_row = y_squares - 1
+
+    cycle = [(0, 0)]
+
+    for y in range(rows):
+        xs = range(1, x_squares) if y % 2 == 0 else range(x_squares - 1, 0, -1)
+        for x in xs:
+
+            cycle.append((x, y))
+
+            #Detours to visit the last row (odd number of rows) from the
+            # row above, two cells at a time (the row above is visited from right to left)
+            if rows != y_squares and y == rows - 1 and (x_squares - 1 - x) % 2 == 0:
+                cycle.extend([(x, last_row), (x - 1, last_row)])
+
+    cycle.extend((0, y) for y in range(rows - 1, 0, -1))
+
+    if rows == y_squares:
+        return cycle, None, None
+
+    return cycle, (0, last_row), (1, rows - 1)
+
+
+class HamiltonianPathfinder:
+
+    '''
+    Class to compute the next move of the snake following a Hamiltonian cycle
+    (with safe shortcuts). It can replace the Pathfinder in the game
+
+    ATTRIBUTES:
+
+        x_squares :     number of cells in the game board in x-direction
+        y_squares :     number of cells in the game board in y-direction
+        cycle :         cell index at every position of the cycle
+        order :         position of every cell index in the cycle (-1 if the cell is out of the cycle)
+        neighbors :     neighbors of every cell index
+        spare :         cell index out of the cycle (None if the cycle visits every cell)
+        partner :       cell index which can be swapped with spare
+
+    METHODS:
+
+        distance :      number of cells between two cells, moving forward in the cycle
+        swap_spare :    swaps the spare cell and its partner when it's needed and safe
+        get_path :      returns the next cell of the snake head
+    '''
+
+    def __init__(self, x_squares, y_squares):
+
+        self.x_squares = x_squares
+        self.y_squares = y_squares
+
+        cycle, spare, partner = hamiltonian_cycle(x_squares, y_squares)
+
+        self.cycle = [x + y * x_squares for x, y in cycle]
+        self.order = [-1] * (x_squares * y_squares)
+
+        for position, cell in enumerate(self.cycle):
+            self.order[cell] = position
+
+        self.neighbors = neighbor_table(x_squares, y_squares)
+
+        self.spare = None if spare is None else spare[0] + spare[1] * x_squares
+        self.partner = None if partner is None else partner[0] + partner[1] * x_squares
+
+    def distance(self, start, end):
+
+        return (self.order[end] - self.order[start]) % len(self.cycle)
+
+    def swap_spare(self, snake, fruit_cells):
+
+        '''
+        Puts the spare cell into the cycle (in place of its partner) when a fruit is there.
+        It's safe if the partner is free, or if it's the tail and the snake fills the cycle
+        with the head right before it (then eating the fruit fills the board)
+        '''
+
+        if self.spare is None or self.spare not in fruit_cells or self.partner in fruit_cells:
+            return
+
+        position = self.order[self.partner]
+        previous = self.cycle[position - 1]
+
+        if snake.occupancy[self.partner] == 0 or (
+            snake.cells[-1] == self.partner and snake.cells[0] == previous and len(snake.cells) == len(self.cycle)):
+
+            self.cycle[position] = self.spare
+            self.order[self.spare], self.order[self.partner] = position, -1
+            self.spare, self.partner = self.partner, self.spare
+
+    def get_path(self, snake, fruit):
+
+        '''
+        Returns the next cell of the snake head (as a one-cell path).
+
+        The snake moves to the neighbor which is farthest forward in the cycle without
+        passing its tail nor the nearest fruit. The next cell in the cycle always satisfies it.
+        '''
+
+        head, tail = snake.cells[0], snake.cells[-1]
+        fruit_cells = [x + y * self.x_squares for x, y in fruit.positions]
+
+        self.swap_spare(snake, fruit_cells)
+
+        #The snake can't pass its tail, nor the nearest fruit in the cycle. If there's
+        # no fruit in the cycle (only in the spare cell), it follows the cycle
+        # until the partner of the spare cell is free
+        fruit_distances = [self.distance(head, cell) for cell in fruit_cells if self.order[cell] >= 0]
+        limit = min(self.distance(head, tail), min(fruit_distances)) if fruit_distances else 1
+
+        best, best_distance = None, 0
+
+        for neighbor in self.neighbors[head]:
+
+            if self.order[neighbor] < 0:
+                continue
+
+            #Free cell or the tail (which moves away, since the snake doesn't eat it)
+            if snake.occupancy[neighbor] == 0 or neighbor == tail:
+                distance = self.distance(head, neighbor)
+                if best_distance < distance <= limit:
+                    best, best_distance = neighbor, distance
+
+        if best is None:
+            best = self.cycle[(self.order[head] + 1) % len(self.cycle)]
+
+        return [(best % self.x_squares, best // self.x_squares)]
@@ -1,7 +1,6 @@
 import pygame as pg
-from pygame.math import Vector2
 
-from game import Game
+from game import Game, MAX_FPS
 
 #Initializing all pygame modules
 pg.init()
@@ -13,7 +12,11 @@ WINDOW_SIZE = 750
 WINDOW = pg.display.set_mode((WINDOW_SIZE, WINDOW_SIZE))
 pg.display.set_caption('Snake game')
 
-#Creating a clock to control the game FPS
+#Renderer of the game board: 'sprites' (images and squares) or 'pixels'
+# (one pixel per cell scaled to the board, for very large boards. Needs NumPy)
+RENDERER = 'sprites'
+
+#Creating a clock to measure the time of every frame
 clock = pg.time.Clock()
 
 #MAIN function
@@ -23,22 +26,16 @@ def main():
     default = ['NORMAL', 'MEDIUM', 'ONE', 'GREEN_MAP', 'RED', 'NO']
 
     #Creating game object
-    game = Game(WINDOW, default)
+    game = Game(WINDOW, default, renderer = RENDERER)
 
     #Main game
     while True:
 
         game.settings.settings_button.set_pos(0.92*WINDOW_SIZE, 60)
 
-        #FPS of the game 
-        #(also used as the velocity of the game)
-        velocity = game.game_variables[0]
-
-        #Increasing the game velocity when using autopilot
-        if game.autopilot:
-            velocity += 80
-
-        clock.tick(velocity)
+        #Time of the last frame (seconds). The speed of the game doesn't depend
+        # on the FPS: the game logic runs at a fixed timestep (see Game.update)
+        elapsed = clock.tick(MAX_FPS) / 1000
 
         #If the snake is not moving, user can
         # change the settings
@@ -55,46 +52,20 @@ def main():
             #Next direction of the snake (head)
             #Snake can't move in the opposite direction 
             if event.type == pg.KEYDOWN:
-                if event.key == pg.K_LEFT and game.snake.direction.x != 1:
-                    game.snake.new_direction = Vector2(-1, 0)
+                if event.key == pg.K_LEFT and game.snake.direction[0] != 1:
+                    game.snake.new_direction = (-1, 0)
 
-                if event.key == pg.K_RIGHT and game.snake.direction.x != -1:
-                    game.snake.new_direction = Vector2(1,0)
+                if event.key == pg.K_RIGHT and game.snake.direction[0] != -1:
+                    game.snake.new_direction = (1,0)
 
-                if event.key == pg.K_UP and game.snake.direction.y != 1 :
-                    game.snake.new_direction = Vector2(0, -1)
+                if event.key == pg.K_UP and game.snake.direction[1] != 1 :
+                    game.snake.new_direction = (0, -1)
 
-                if event.key == pg.K_DOWN and game.snake.direction.y != -1:
-                    game.snake.new_direction = Vector2(0,1)
+                if event.key == pg.K_DOWN and game.snake.direction[1] != -1:
+                    game.snake.new_direction = (0,1)
 
         if game.playing == True: 
-            #Checking if the snake x,y-position are integers
-            # so the snake can move to a new direction
-            if (abs(game.snake.body[0][0] - round(game.snake.body[0][0])) < 0.001) and (
-                abs(game.snake.body[0][1] - round(game.snake.body[0][1])) < 0.001):
-
-                #Rounding the coordinates of the snake body to avoid
-                # decimal errors
-                for i in range(len(game.snake.body)):
-                    game.snake.body[i] = Vector2(round(game.snake.body[i][0]), round(game.snake.body[i][1]))
-
-                #Autopilot case
-                if game.autopilot:
-                
-                    #Creating the path using the pathfinder
-                    path = game.pathfinder.get_path(game.snake, game.fruit)
-
-                    if path:
 
-                        #Directions to move the snake to the neighbor location
-                        x_dir = path[0][0] - game.snake.body[0][0]
-                        y_dir = path[0][1] - game.snake.body[0][1]
-
-                    game.snake.new_direction = Vector2(x_dir, y_dir)
-
-                game.snake.direction = game.snake.new_direction
-                game.snake.body_block_direction()
-          
             #SETTINGS WINDOW
 
             #If user click in the settings button
@@ -109,15 +80,15 @@ def main():
                 if game.settings.check_option(WINDOW):
                     game.display_settings = False
                     default = game.settings.get_options()
-                    game = Game(WINDOW, default)
+                    game = Game(WINDOW, default, renderer = RENDERER)
 
-            #Settings window closed
-            else:
-                game.update()
-                game.draw_window()
-                game.snake.moves_without_eating += 1 / game.snake.cell_division
+                pg.display.update()
 
-            pg.display.update()
+            #Settings window closed: only the regions
+            # that change are drawn and updated
+            else:
+                game.update(elapsed)
+                pg.display.update(game.draw_dirty())
 
         #Not playing (ending)
         else:
@@ -130,7 +101,7 @@ def main():
                 #Changing the Autopilot option to prevent the game
                 # from playing indefinitely
                 default[-1] = 'NO'
-                game = Game(WINDOW, default)
+                game = Game(WINDOW, default, renderer = RENDERER)
 
             elif exit:
                 break
@@ -1,6 +1,9 @@
-from snake import Snake
-from pygame.math import Vector2
+from collections import deque, OrderedDict
+from math import inf
 from random import shuffle
+from time import perf_counter
+
+from search import SEARCHES, GridSearch, DistanceField
 
 class Pathfinder:
 
@@ -10,30 +13,74 @@ class Pathfinder:
 
     ATTRIBUTES:
 
-        CELL_WIDTH :    size of a single cell of the game board
         x_squares :     number of cells in the game board in x-direction
         y_squares :     number of cells in the game board in y-direction
-        CELLS :         list containing every cell coordinate in the game board
+        search :        search strategy (see SEARCHES in search.py) used for the paths between two points
+        field :         DistanceField object, filled once per decision from the snake head
+        use_field :     True if the paths to the fruits come from the distance field (BFS search), False
+                        if they come from the search strategy (one search per fruit, see fruit_paths)
+        plan :          path being followed (deque of (x, y) cells, see get_path), or None
+        plan_length :   length of the snake when the plan was made
+        plan_fruits :   positions of the fruits when the plan was made
+        plan_hits :     number of calls answered with the plan
+        plan_misses :   number of calls which needed a new plan
+        decisions :     LRU cache of the plans made, by Zobrist hash of the snake and the fruits
+        decision_cache_size :   max. number of plans in decisions (0 to disable it)
+        decision_hits :         number of new plans found in decisions
+        decision_misses :       number of new plans which weren't in decisions
+        decision_evictions :    number of plans removed from decisions to make room
+        time_budget :   max. time (milliseconds) to make a new plan, or None for no limit (see budgeted_path)
+        lookahead_times :       estimated time (seconds) of every lookahead depth of budgeted_path (the whole
+                                budget at first, so the depths of unknown cost are tried gradually in the first calls)
+        depth_counts :          number of budgeted decisions that completed every depth
 
     METHODS:
 
         manhattan_distance :       computes the Manhattan distance (aka Taxicab) between two points
-        is_empty_cell :            returns False if a specific cell is occupied and True otherwise
-        get_free_neighbors :       returns free neighbors of a specific position
-        create_virtual_snake :     creates a copy of the original snake
+        field_neighbors :          returns free neighbors of the snake head, using the distance field
+        distance_field :           computes the distances from the snake head to every reachable cell
         path_to_tail :             creates a path between the head of the snake and its tail
-        breadth_search_first :     creates the shortest path between two points using the BFS algorithm
-        longest_path_to_tail :     creates the longest path between the head of the snake and its tail
+        shortest_path :            creates the shortest path between two points using the search strategy
+        expanded_nodes :           returns the number of nodes expanded by the searches and by the distance fields
+        longest_path_to_tail :     creates a long path between the head of the snake and its body
+        stretch_path :             makes a path longer with detours through free cells
         safe_move :                creates a path to any 'safe' location
-        get_path :                 creates the 'final' path depending on every possible case
+        get_path :                 returns the path to follow, reusing the last plan while it's valid
+        cached_plan :              returns the plan of a state, from the LRU cache of plans when it's there
+        budgeted_path :            returns the best plan found within the time budget, deepening the lookahead
+        area_move :                moves to the neighbor with the largest free area (lookahead of depth 1)
+        escape_move :              moves to the neighbor nearest to a fruit with an escape (lookahead of depth 2)
+        plan_path :                creates the 'final' path depending on every possible case (stopping at a deadline)
+        out_of_time :              checks if a deadline has passed
+        fruit_paths :              returns the shortest paths to the reachable fruits, from the nearest one
+        escape_after_eating :      checks if the snake can follow its tail after eating a fruit
+        free_times :               returns the tick at which every cell of the snake body becomes free
     '''
 
-    def __init__(self, x_squares, y_squares, CELL_WIDTH):
+    def __init__(self, x_squares, y_squares, search = 'bfs', decision_cache_size = 4096, time_budget = None):
 
-        self.CELL_WIDTH = CELL_WIDTH
         self.x_squares = x_squares
         self.y_squares = y_squares
-        self.CELLS = [[i, j] for i in range(self.x_squares) for j in range(self.y_squares)]
+        self.search = SEARCHES[search](self.x_squares, self.y_squares)
+        self.field = DistanceField(self.x_squares, self.y_squares)
+        self.use_field = type(self.search) is GridSearch
+
+        self.plan = None
+        self.plan_length = 0
+        self.plan_fruits = []
+        self.plan_hits = 0
+        self.plan_misses = 0
+
+        self.decisions = OrderedDict()
+        self.decision_cache_size = decision_cache_size
+        self.decision_hits = 0
+        self.decision_misses = 0
+        self.decision_evictions = 0
+
+        self.time_budget = time_budget
+        self.lookaheads = (self.area_move, self.escape_move, self.cached_plan)
+        self.lookahead_times = [(time_budget or 0) / 1000] * len(self.lookaheads)
+        self.depth_counts = [0] * (len(self.lookaheads) + 1)
 
     def manhattan_distance(self, pos1, pos2):
         '''
@@ -46,268 +93,526 @@ class Pathfinder:
 
         return abs(x2 - x1) + abs(y2 - y1)
 
-    def is_empty_cell(self, current_pos, snk_body):
+    def field_neighbors(self, field, snake, fruit_positions, free_tail = False):
 
         '''
-        Checks if the position (current_pos) is available or not
-        
-        '''
-        #Current pos out of the game board
-        if (current_pos[0] >= self.x_squares or current_pos[0] < 0) or (
-            current_pos[1] >= self.y_squares or current_pos[1] < 0):
+        Gets every free neighbor of the snake head which isn't a fruit (right, left, down,
+        up, see neighbor_table in search.py). They are the cells at distance 1 in the distance field
 
-            return False
+        free_tail : if True, the cell of the snake tail is considered to be available
+        '''
 
-        #Position occupied by the snake body
-        for block_pos in snk_body:
-            if block_pos == current_pos:
-                return False
+        tail = snake.cells[-1]
 
-        return True
+        return [field.cells[neighbor] for neighbor in field.neighbors[field.start] if field.distance(neighbor) == 1
+                and field.cells[neighbor] not in fruit_positions and (free_tail or neighbor != tail)]
 
-    def get_free_neighbors(self, current_pos, snk_body, fruit_pos):
+    def distance_field(self, snake):
 
         '''
-        Gets every free neighbor of a specific location
+        Floods the board from the snake head. The tail is reached (it'll be free
+        when the head gets there) but not crossed, so the same field gives the
+        shortest paths to the fruit(s) and to the tail
         '''
 
-        #Every neighbor of the current location
-        neighbors = [[current_pos[0] + 1, current_pos[1]], [current_pos[0] - 1, current_pos[1]],
-                 [current_pos[0], current_pos[1] + 1], [current_pos[0], current_pos[1] - 1]]
+        tail = snake.cells[-1]
+        sink = tail if snake.occupancy[tail] == 1 else -1
 
-        free_neighbors = []
+        self.field.fill(snake.cells[0], snake.occupancy, sink)
 
-        for neighbor in neighbors:
-            #If the neighbor is free, we add it to free_neighbors
-            if self.is_empty_cell(neighbor, snk_body) and fruit_pos != neighbor:
-                free_neighbors.append(tuple(neighbor))
+        return self.field
 
-        return free_neighbors
+    def path_to_tail(self, snake):
+
+        #Path from the head of the snake to its tail
+        path = self.shortest_path(snake.head, snake.tail, snake, free_tail = True)
+
+        return path
 
-    def create_virtual_snake(self, snake):
+    def shortest_path(self, start_pos, end_pos, snake, free_tail = False):
 
         '''
-        Creates a copy of the snake. We only need to copy the parameters associated
-        with the motion of the virtual snake
+        Shortest path between two positions (see find_path in search.py).
+        The number of nodes expanded is stored in self.search.expanded
+
+        free_tail : if True, the cell of the snake tail is considered to be available
         '''
 
-        snake_copy = Snake(snake.snake_color, self.CELL_WIDTH, True)
-        snake_copy.body  = snake.body[:]
-        snake_copy.direction = snake.direction
+        #The tail cell is only available if no other block is there
+        free_cell = -1
+        if free_tail:
+            tail = snake.cells[-1]
+            if snake.occupancy[tail] == 1:
+                free_cell = tail
 
-        return snake_copy
+        return self.search.find_path(self.search.index(start_pos), self.search.index(end_pos), snake.occupancy, free_cell)
 
-    def path_to_tail(self, snake):
+    def expanded_nodes(self):
 
-        #Path from the head of the snake to its tail
-        path = self.breadth_first_search(tuple(snake.body[0]), tuple(snake.body[-1]), snake.body[:-1])
+        '''
+        RETURN : a tuple with the number of nodes expanded by the searches (search strategy)
+                 and by the distance fields (always a BFS flood)
 
-        return path
+        EXTRA COMMENTS : the searches include the escapes and the free areas (find_escape and
+            count_area), which are the same for every search strategy
+        '''
 
+        return self.search.total_expanded, self.field.total_expanded
 
-    def breadth_first_search(self, start_pos, end_pos, snake_body):
+    def longest_path_to_tail(self, snake, fruit, deadline = None):
 
-        #Initializing visited positions and parents nodes
-        visited = {tuple(pos): False for pos in self.CELLS}
-        parent_nodes = {tuple(pos): None for pos in self.CELLS}
+        '''
+        Creates a long path between the head of the snake and its body. The first step is
+        the neighbor farthest from the tail from which the snake can still escape, and the
+        shortest escape from there (to a cell of the body once it's free, see find_escape in
+        search.py) is stretched with detours through the free cells.
+
+        Every cell of the path is free when the head gets there (it doesn't go through the
+        fruits) and only the head moves into them, so the whole path is safe to follow (see
+        get_path). It's only stretched while the snake fills less than half of the board:
+        when it's longer, a new path (using the cells freed by the tail) is much better,
+        so only the first step is returned
+
+        deadline : perf_counter() time at which the stretching stops (None for no limit)
+        '''
 
-        #Initial Queue and visited position
-        queue = [start_pos]  
-        visited[start_pos] = True
+        keep_path = 2 * len(snake.cells) < self.x_squares * self.y_squares
 
-        #All neighbors for every cell in the game board
-        all_neighbors = {tuple(pos): [[pos[0] + 1, pos[1]], [pos[0] - 1, pos[1]],
-                 [pos[0], pos[1] + 1], [pos[0], pos[1] - 1]] for pos in self.CELLS}
+        head, tail = snake.cells[0], snake.cells[-1]
+        fruit_cells = [self.search.index(fruit_pos) for fruit_pos in fruit.positions]
+        free_times = self.free_times(snake, fruit)
 
-        # While queue is not empty
-        while queue:
+        best_neighbor, best_path, distance = -1, None, -1
 
-            node = queue.pop(0)
-            current_neighbors = all_neighbors[node]
-            
-            #Iterating through every neighbor of the current node
-            for next_node in current_neighbors:
+        #Iterating through every neighbor (which isn't a fruit)
+        for neighbor in self.search.neighbors[head]:
 
-                #Checking if the cell is free and is not visited
-                if self.is_empty_cell(next_node, snake_body) and not visited[tuple(next_node)]:
-                    queue.append(tuple(next_node))
-                    visited[tuple(next_node)] = True
-                    parent_nodes[tuple(next_node)] = node
+            if neighbor in fruit_cells or (snake.occupancy[neighbor] and neighbor != tail):
+                continue
 
+            #Checking if the distance between the neighbor and
+            # the tail increases
+            if self.manhattan_distance(self.search.cells[neighbor], snake.tail) > distance:
 
-        #Reconstructing the path
-        path = list()
-        parent_node = end_pos
+                #If the snake can escape from the new location, the neighbor is kept
+                path = self.search.find_escape(neighbor, 1, free_times)
 
-        while True:
+                if path:
+                    best_neighbor, best_path = neighbor, path
+                    distance = self.manhattan_distance(self.search.cells[neighbor], snake.tail)
 
-            #There's no path
-            if parent_nodes[tuple(parent_node)] is None:
-                return []
+        if best_path is None:
+            return None
 
-            #New parent node
-            parent_node = parent_nodes[tuple(parent_node)]
+        path = [self.search.cells[best_neighbor]]
 
-            #If we arrive at the starting position, we've finished
-            if parent_node == start_pos:
-                path.append(end_pos)
+        if keep_path:
 
-                return path
+            #The detours don't go through the fruits
+            occupancy = snake.occupancy[:]
+            for cell in fruit_cells:
+                occupancy[cell] = 1
 
-            #Constructing the path
-            path.insert(0, parent_node)
-    
-    def longest_path_to_tail(self, snake, fruit):
+            path += self.stretch_path(best_neighbor, best_path, occupancy, deadline)
 
+        return path
+
+    def stretch_path(self, start, path, occupancy, deadline = None):
+
+        '''
+        Makes a path longer: every step between two cells is replaced by a detour through
+        the two free cells next to them (on the same side), until no step can be replaced
+
+        start : cell index where the path begins
+        path : list of (x, y) cells from the first step
+        occupancy : grid of the cells which can't be used (snake body and fruits)
+        deadline : perf_counter() time at which no more detours are added (None for no limit)
+
+        RETURN : the stretched path, as a list of (x, y) cells from the first step
         '''
-         Creates the longest path between the head of the snake and its tail
-         '''
 
-        #Neighbors of the current location (head)
-        neighbors = self.get_free_neighbors(snake.body[0], snake.body, fruit.positions[0])
-        path = []
+        x_squares, y_squares = self.x_squares, self.y_squares
+        cells = [start] + [self.search.index(cell) for cell in path]
 
-        if neighbors:
+        #Cells which can't be used in a detour
+        used = occupancy[:]
+        for cell in cells:
+            used[cell] = 1
 
-            distance = -1      #Default value
+        i = 0
+        while i < len(cells) - 1 and not self.out_of_time(deadline):
 
-            #Iterating thorugh every neighbor
-            for neighbor in neighbors:
+            first, second = cells[i], cells[i + 1]
 
-                #Checking if the distance between the neighbor and
-                # the tail increases
-                if self.manhattan_distance(neighbor, snake.body[-1]) > distance:
+            #Sides of the step: up and down for horizontal steps, right and left for vertical ones
+            sides = (-x_squares, x_squares) if second - first in (1, -1) else (1, -1)
 
-                    #Creating a virtual snake
-                    v_snake = self.create_virtual_snake(snake)
+            for side in sides:
 
-                    #Directions to move the snake to the neighbor location
-                    x_dir = neighbor[0] - v_snake.body[0][0]
-                    y_dir = neighbor[1] - v_snake.body[0][1]
-                    v_snake.direction = Vector2(x_dir, y_dir)
-                  
-                    #Moving virtual snake
-                    v_snake.move_snake()
+                detour_first, detour_second = first + side, second + side
 
-                    #Checking if the virtual snake eats a fruit
-                    if v_snake.body[0] == fruit.positions[0]:
-                        new_block = v_snake.body[-1] - v_snake.tail_direction
-                        v_snake.body.append(new_block)
+                #Both cells must be inside the board and free
+                if side in (1, -1) and (first % x_squares + side) in (-1, x_squares):
+                    continue
 
-                    #If the snake can follow its tail in the new
-                    # location, we add it into the path
-                    if self.path_to_tail(v_snake):
-                        path.append(neighbor)
-                        distance = self.manhattan_distance(neighbor,snake.body[-1])
+                if not (0 <= detour_first < x_squares * y_squares and 0 <= detour_second < x_squares * y_squares):
+                    continue
 
-            #Returning the path (if exists) wich
-            # maximize the distance        
-            if path:
-                return [path[-1]]
+                if not used[detour_first] and not used[detour_second]:
+                    cells[i + 1:i + 1] = [detour_first, detour_second]
+                    used[detour_first] = used[detour_second] = 1
+                    break
+
+            #The step isn't replaced, we move to the next one (otherwise the
+            # new first step of the detour is checked again)
+            else:
+                i += 1
 
-    def safe_move(self, snake, fruit):
+        return [self.search.cells[cell] for cell in cells[1:]]
+
+    def safe_move(self, snake, fruit, field):
+
+        '''
+        Chooses a neighbor when there's no better option: one from which the
+        snake can escape (even through the fruits) or, if there isn't any, the one
+        with the largest free area around, to survive as long as possible.
+
+        The free area is counted first (up to the length of the snake), and the
+        escape is only searched for pockets smaller than the snake: the snake fits
+        in the bigger ones, so they aren't dead ends
+        '''
 
         #Available neighbors of the current location
-        neighbors = self.get_free_neighbors(snake.body[0], snake.body[:-1], fruit.positions[0])
+        neighbors = self.field_neighbors(field, snake, fruit.positions, free_tail = True)
+
+        #Last resort: the escape can go through the fruits
+        free_times = self.free_times(snake)
+        length = len(snake.cells)
 
         #Shuffling the neighbors to avoid cycles
         shuffle(neighbors)
 
-        paths = []
-        if neighbors:
-
-            #Iterating through every neighbor
-            for neighbor in neighbors:
-
-                #Adding the neighbor into the path
-                paths.append(neighbor)
+        best_neighbor, best_area = None, 0
 
-                #Creating a virtual snake
-                v_snake = self.create_virtual_snake(snake)
+        #Iterating through every neighbor
+        for neighbor in neighbors:
 
-                #Directions to move the snake to the neighbor location
-                x_dir = paths[-1][0] - v_snake.body[0][0]
-                y_dir = paths[-1][1] - v_snake.body[0][1]
+            index = self.search.index(neighbor)
 
-                v_snake.direction = Vector2(x_dir, y_dir)
+            area = self.search.count_area(index, snake.occupancy, length)
 
-                #Moving the virtual snake
-                v_snake.move_snake()
+            #If the snake fits in the free area or can escape from the
+            # new location, we add it into the path
+            if area == length or self.search.find_escape(index, 1, free_times):
+                return [neighbor]
 
-                #If the snake can follow its tail in the new
-                # location, we add it into the path
-                if self.path_to_tail(v_snake):
-                    return [paths[-1]]
+            if area > best_area:
+                best_neighbor, best_area = neighbor, area
 
-                #Else, the snake follows its tail
-                else:
-                    return self.path_to_tail(snake)
+        #Else, the snake goes to the largest dead end
+        if best_neighbor is not None:
+            return [best_neighbor]
 
     def get_path(self, snake, fruit):
 
         '''
-        Creates the 'final' path depending on every possible case.
+        Returns the path that the snake must follow (only its first cell is used).
+
+        Every path of plan_path is safe to follow until its end, so it's kept as a plan
+        and the next calls only drop the cell reached by the head (O(1)). A new plan is
+        made when the snake eats a fruit (it grows and a new fruit appears) or when it
+        doesn't follow the plan.
 
+        The same state (body and fruits) often comes back, so the new plans are kept in
+        an LRU cache by the Zobrist hash of the state and reused without any search
         '''
 
         #To prevent the snake from moving in cycles at the end
-        if snake.moves_without_eating >= 10*self.x_squares*self.y_squares and (
-            self.manhattan_distance(snake.body[0], fruit.positions[0]) == 1):
+        if snake.moves_without_eating >= 10*self.x_squares*self.y_squares:
+            for fruit_pos in fruit.positions:
+                if self.manhattan_distance(snake.head, fruit_pos) == 1:
+                    self.plan = None
+                    return [fruit_pos]
+
+        #Following the plan made in a previous call
+        plan = self.plan
+        if plan and snake.head == plan[0] and len(snake.cells) == self.plan_length and fruit.positions == self.plan_fruits:
+            plan.popleft()
+
+            if plan:
+                self.plan_hits += 1
+                return plan
 
-            return [fruit.positions[0]]
+        self.plan_misses += 1
 
-        #Creating a virtual snake
-        v_snake = self.create_virtual_snake(snake)
+        if self.time_budget is None:
+            path = self.cached_plan(snake, fruit)
 
-        #Shortest path to the fruit
-        path_to_fruit = self.breadth_first_search(tuple(v_snake.body[0]), tuple(fruit.positions[0]), v_snake.body)
+        else:
+            path = self.budgeted_path(snake, fruit)
 
-        path_to_tail = []
+        self.plan = deque(path) if path else None
+        self.plan_length = len(snake.cells)
+        self.plan_fruits = list(fruit.positions)
 
-        if path_to_fruit:
+        return self.plan
 
-            #Making the virtual snake to follow the path
-            # to the fruit
-            for pos in path_to_fruit:
+    def cached_plan(self, snake, fruit, neighbors = None, deadline = None):
+
+        '''
+        Returns the plan of the state of the snake and the fruits, from the LRU
+        cache (decisions) or made with plan_path (and added to the cache)
+
+        neighbors : not used, plan_path checks the neighbors itself (see budgeted_path)
+        deadline : perf_counter() time at which plan_path gives up (None for no limit),
+                   in which case nothing is added to the cache
+        '''
 
-                #Directions to move the snake to the neighbor location
-                x_dir = pos[0] - v_snake.body[0][0]
-                y_dir = pos[1] - v_snake.body[0][1]
+        if not self.decision_cache_size:
+            return self.plan_path(snake, fruit, deadline)
 
-                v_snake.direction = Vector2(x_dir, y_dir)
+        state = snake.zobrist ^ fruit.zobrist
 
-                #Moving the virtual snake
-                v_snake.move_snake()
+        if state in self.decisions:
+            self.decision_hits += 1
+            self.decisions.move_to_end(state)
+            return self.decisions[state]
 
-            #Increasing the size of the virtual snake, because
-            # it eat a fruit
-            new_block = v_snake.body[-1] - v_snake.tail_direction
-            v_snake.body.append(new_block)
+        self.decision_misses += 1
 
-            #Path from the snake head to its tail
-            # from the fruit position
-            path_to_tail = self.path_to_tail(v_snake)
-        
-        #If there's an 'escape' path (path_to_tail)
-        # the real snake will follow the path_to_fruit
-        if path_to_tail:
-            return path_to_fruit
+        path = self.plan_path(snake, fruit, deadline)
+
+        #Without a plan, plan_path may have stopped at the deadline
+        if not path and deadline is not None:
+            return path
+
+        self.decisions[state] = tuple(path) if path else None
+
+        #Removing the least recently used plan
+        if len(self.decisions) > self.decision_cache_size:
+            self.decisions.popitem(last = False)
+            self.decision_evictions += 1
+
+        return path
+
+    def budgeted_path(self, snake, fruit):
+
+        '''
+        Anytime version of cached_plan, which returns after about self.time_budget
+        (milliseconds) for a bounded latency on every board size.
+
+        The lookahead is deepened one depth at a time (see self.lookaheads, which take the
+        same arguments: snake, fruit, neighbors and deadline) over the neighbors of the head,
+        and the best move found so far is returned when the budget is spent. The deepest one is the usual plan (cached_plan), so the game is the
+        same when there's time enough. A depth is only started if its last cost
+        (lookahead_times, which slowly forgets the slow calls) fits in the remaining time.
+
+        EXTRA COMMENTS : the first two depths can't be interrupted, and the last one
+            (plan_path) stops at the deadline between its steps (every fruit, the longest
+            path and the safe move) and while stretching the longest path. So the budget is
+            exceeded by at most one of those steps, a few searches over the board
+
+        RETURN : the plan (list of (x, y) cells), or None if the snake can't move
+        '''
+
+        deadline = perf_counter() + self.time_budget / 1000
+
+        #Moves inside the board to a free cell or to the tail (which moves away)
+        head, tail = snake.cells[0], snake.cells[-1]
+        neighbors = [neighbor for neighbor in self.search.neighbors[head] if snake.occupancy[neighbor] == 0
+                     or (neighbor == tail and snake.occupancy[tail] == 1)]
+
+        if not neighbors:
+            return None
+
+        #Depth 0: the neighbor nearest to a fruit
+        if fruit.positions:
+            neighbors.sort(key = lambda neighbor: min(self.manhattan_distance(self.search.cells[neighbor], fruit_pos)
+                                                      for fruit_pos in fruit.positions))
+
+        best, depth = [self.search.cells[neighbors[0]]], 0
+
+        for lookahead in self.lookaheads:
+
+            #The estimate is also forgotten when the depth is skipped, so it's tried again later
+            start = perf_counter()
+            if start + self.lookahead_times[depth] > deadline:
+                self.lookahead_times[depth] *= 0.9
+                break
+
+            path = lookahead(snake, fruit, neighbors, deadline)
+
+            elapsed = perf_counter() - start
+            self.lookahead_times[depth] = max(elapsed, 0.9 * self.lookahead_times[depth])
+
+            depth += 1
+
+            if path:
+                best = path
+
+        self.depth_counts[depth] += 1
+
+        return best
+
+    def area_move(self, snake, fruit, neighbors, deadline = None):
+
+        '''
+        Neighbor with the largest free area around (counted up to the length of the
+        snake, see count_area in search.py). The first one wins the ties
+
+        deadline : not used, the free areas are always counted (see budgeted_path)
+        '''
+
+        length = len(snake.cells)
+        best_neighbor, best_area = None, -1
+
+        for neighbor in neighbors:
+
+            area = self.search.count_area(neighbor, snake.occupancy, length)
+
+            if area > best_area:
+                best_neighbor, best_area = neighbor, area
+
+        return [self.search.cells[best_neighbor]]
+
+    def escape_move(self, snake, fruit, neighbors, deadline = None):
+
+        '''
+        First neighbor (the nearest to a fruit) from which the snake can still escape:
+        eating the fruit if it's there (escape_after_eating) or following its body
+        (find_escape in search.py). None if there isn't any
+
+        deadline : not used, every neighbor is checked (see budgeted_path)
+        '''
+
+        free_times = self.free_times(snake, fruit)
+
+        for neighbor in neighbors:
+
+            neighbor_pos = self.search.cells[neighbor]
+
+            if neighbor_pos in fruit.positions:
+                if self.escape_after_eating(snake, fruit, [neighbor_pos]):
+                    return [neighbor_pos]
+
+            elif self.search.find_escape(neighbor, 1, free_times):
+                return [neighbor_pos]
+
+    def plan_path(self, snake, fruit, deadline = None):
+
+        '''
+        Creates the 'final' path depending on every possible case.
+
+        deadline : perf_counter() time after which no other case is checked (None for no limit),
+                   in which case None is returned. The longest path may be stretched less than
+                   without deadline, the other paths found are the same
+        '''
+
+        #Distances from the head to every cell
+        field = self.distance_field(snake) if self.use_field else None
+
+        #Shortest path to every reachable fruit, from the nearest to the farthest
+        for path_to_fruit in self.fruit_paths(snake, fruit, field):
+
+            if self.out_of_time(deadline):
+                return None
+
+            #If there's an 'escape' path (path_to_tail) after eating
+            # the real snake will follow the path_to_fruit
+            if self.escape_after_eating(snake, fruit, path_to_fruit):
+                return path_to_fruit
 
         # If path_to_fruit or path_to_tail are not available:
         # ------We make the snake follow the longest path to its tail
         # ------If it's not available either, we make the snake follow a 'safe_move'
 
+        if self.out_of_time(deadline):
+            return None
+
         #Longest path to snake tail
-        longest_path = self.longest_path_to_tail(snake, fruit)
+        longest_path = self.longest_path_to_tail(snake, fruit, deadline)
 
         if longest_path:
             return longest_path
 
-        #Safe move
-        safe_move = self.safe_move(snake, fruit)
+        #Safe move (the distance field isn't filled yet if the search strategy found the fruits)
+        if self.out_of_time(deadline):
+            return None
+
+        if field is None:
+            field = self.distance_field(snake)
+
+        safe_move = self.safe_move(snake, fruit, field)
 
         if safe_move:
             return safe_move
 
+    def out_of_time(self, deadline):
+
+        return deadline is not None and perf_counter() > deadline
+
+    def fruit_paths(self, snake, fruit, field = None):
+
+        '''
+        Yields the shortest path to every reachable fruit, from the nearest to the farthest.
+
+        field : DistanceField filled from the snake head. If it's given, the paths are
+                read from it (a single flood for every fruit), otherwise every path is
+                searched with the search strategy (see shortest_path)
+        '''
+
+        fruit_cells = [self.search.index(fruit_pos) for fruit_pos in fruit.positions]
+
+        if field is not None:
+
+            for distance, fruit_index in sorted((field.distance(cell), cell) for cell in fruit_cells):
+                if distance > 0:
+                    yield field.path_to(fruit_index)
+
+            return
+
+        paths = [(self.search.find_path(snake.cells[0], cell, snake.occupancy), cell) for cell in fruit_cells]
+
+        for path, _ in sorted(paths, key = lambda item: (len(item[0]), item[1])):
+            if path:
+                yield path
+
+    def escape_after_eating(self, snake, fruit, path_to_fruit):
+
+        '''
+        Checks if the snake can still follow its tail after
+        following path_to_fruit and eating the fruit at its end
+        '''
+
+        #The virtual snake grows one block for the fruit, and
+        # another one for every fruit on the way
+        growth = 1 + sum(pos in fruit.positions for pos in path_to_fruit[:-1])
+
+        #Virtual snake at the fruit position
+        v_snake = snake.after_path(path_to_fruit, growth)
+
+        #Path from the snake head to its tail
+        # from the fruit position
+        return bool(self.path_to_tail(v_snake))
+
+    def free_times(self, snake, fruit = None):
+
+        '''
+        Tick at which every cell of the board becomes free if the snake doesn't grow
+        (0 for free cells): 1 for the tail, 2 for the block before it, and so on
+
+        fruit : if it's given, the fruits never become free (the snake would grow eating them)
+        '''
+
+        free_times = [0] * (self.x_squares * self.y_squares)
+
+        if fruit is not None:
+            for fruit_pos in fruit.positions:
+                free_times[self.search.index(fruit_pos)] = inf
+
+        #From the tail to the head, so a cell with more than one
+        # block gets the tick of the last one
+        for time, cell in enumerate(reversed(snake.cells), 1):
+            free_times[cell] = time
 
-    
+        return free_times
@@ -0,0 +1,512 @@
+'''
+Search engines used by the Pathfinder.
+
+Cells are flat integer indices (x + y*x_squares). The neighbors of every cell are
+computed once per board size, and the visited/parent arrays are reused between
+searches: a cell is visited in the current search only if its stamp equals the
+current generation, so nothing has to be cleared or allocated per call.
+
+Every search strategy (BFS, A*, bidirectional BFS) has the same find_path method,
+and counts the nodes it expands, so they can be swapped and compared.
+'''
+
+from collections import deque
+from heapq import heappush, heappop
+
+#Neighbor tables already computed, for every board size (X, Y)
+_NEIGHBOR_TABLES = {}
+
+
+def neighbor_table(x_squares, y_squares):
+
+    '''
+    Returns a tuple with the neighbors (indices) of every cell of the board,
+    always in the same order: right, left, down, up
+    '''
+
+    key = (x_squares, y_squares)
+
+    if key not in _NEIGHBOR_TABLES:
+
+        table = []
+
+        for index in range(x_squares * y_squares):
+
+            x, y = index % x_squares, index // x_squares
+            neighbors = []
+
+            for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                if 0 <= x + dx < x_squares and 0 <= y + dy < y_squares:
+                    neighbors.append(x + dx + (y + dy) * x_squares)
+
+            table.append(tuple(neighbors))
+
+        _NEIGHBOR_TABLES[key] = tuple(table)
+
+    return _NEIGHBOR_TABLES[key]
+
+
+class GridSearch:
+
+    '''
+    Breadth-First-Search over the cells of the game board
+
+    ATTRIBUTES:
+
+        x_squares, y_squares :  number of cells in the game board in the X and Y directions
+        neighbors :             neighbors of every cell (see neighbor_table)
+        cells :                 (x, y) coordinates of every cell index
+        visited :               generation in which every cell was visited for the last time
+        parents :               parent of every cell in the last search that visited it
+        generation :            number of the current search
+        expanded :              number of nodes expanded in the last search
+        total_expanded :        number of nodes expanded in every search
+
+    METHODS:
+
+        index :         transforms (x, y) coordinates into a cell index
+        find_path :     creates the shortest path between two cells
+        find_escape :   creates the shortest path to a cell of the snake body once it's free (time-aware search)
+        count_area :    counts the free cells reachable from a cell
+        build_path :    reconstructs the path to a cell using the parents array
+    '''
+
+    def __init__(self, x_squares, y_squares):
+
+        self.x_squares = x_squares
+        self.y_squares = y_squares
+        self.neighbors = neighbor_table(x_squares, y_squares)
+        self.cells = [(index % x_squares, index // x_squares) for index in range(x_squares * y_squares)]
+
+        self.visited = [0] * (x_squares * y_squares)
+        self.parents = [0] * (x_squares * y_squares)
+        self.generation = 0
+
+        self.expanded = 0
+        self.total_expanded = 0
+
+    def index(self, cell):
+
+        return cell[0] + cell[1] * self.x_squares
+
+    def find_path(self, start, end, occupancy, free_cell = -1):
+
+        '''
+        Shortest path from start to end (cell indices), moving only through
+        cells with no blocks in the occupancy grid (or through free_cell)
+
+        RETURN : a list of (x, y) cells from the first step to end, or [] if there's no path
+        '''
+
+        self.generation += 1
+        generation = self.generation
+        visited, parents, neighbors = self.visited, self.parents, self.neighbors
+
+        queue = deque((start,))
+        visited[start] = generation
+        expanded = 0
+
+        while queue:
+
+            node = queue.popleft()
+            expanded += 1
+
+            #Iterating through every neighbor of the current node
+            for next_node in neighbors[node]:
+
+                #Checking if the cell is free and is not visited
+                if visited[next_node] != generation and (not occupancy[next_node] or next_node == free_cell):
+                    visited[next_node] = generation
+                    parents[next_node] = node
+
+                    #Parents never change once set, so we can stop here
+                    if next_node == end:
+                        self.count_expanded(expanded)
+                        return self.build_path(start, end)
+
+                    queue.append(next_node)
+
+        self.count_expanded(expanded)
+
+        return []
+
+    def find_escape(self, start, start_time, free_times):
+
+        '''
+        Time-aware Breadth-First-Search from start (cell index), which the head reaches
+        at tick start_time. Every cell of the snake body becomes free at a tick given by
+        free_times (0 for free cells), and it can be crossed if the search reaches it
+        after that tick.
+
+        The search stops at the first cell of the body reached once it's free: from there
+        the head can follow the rest of the body (every next cell becomes free one tick
+        later), so the snake can't be trapped.
+
+        RETURN : a list of (x, y) cells from the first step to that cell, or [] if there's no escape
+        '''
+
+        self.generation += 1
+        generation = self.generation
+        visited, parents, neighbors = self.visited, self.parents, self.neighbors
+
+        visited[start] = generation
+        frontier = [start]
+        time = start_time
+        expanded = 0
+
+        #The search goes one tick (level) at a time
+        while frontier:
+
+            time += 1
+            next_frontier = []
+
+            for node in frontier:
+
+                expanded += 1
+
+                for next_node in neighbors[node]:
+
+                    if visited[next_node] == generation:
+                        continue
+
+                    free_time = free_times[next_node]
+
+                    #Free cell
+                    if not free_time:
+                        visited[next_node] = generation
+                        parents[next_node] = node
+                        next_frontier.append(next_node)
+
+                    #Cell of the body, free when the head gets there
+                    elif free_time <= time:
+                        parents[next_node] = node
+                        self.count_expanded(expanded)
+                        return self.build_path(start, next_node)
+
+            frontier = next_frontier
+
+        self.count_expanded(expanded)
+
+        return []
+
+    def count_area(self, start, occupancy, limit):
+
+        '''
+        Counts the free cells reachable from start (cell index, included), with a
+        flood fill which stops as soon as limit cells are found
+
+        RETURN : the number of cells found (at most limit)
+        '''
+
+        self.generation += 1
+        generation = self.generation
+        visited, neighbors = self.visited, self.neighbors
+
+        visited[start] = generation
+        stack = [start]
+        area = 1
+        expanded = 0
+
+        while stack and area < limit:
+
+            node = stack.pop()
+            expanded += 1
+
+            for next_node in neighbors[node]:
+                if visited[next_node] != generation and not occupancy[next_node]:
+                    visited[next_node] = generation
+                    stack.append(next_node)
+                    area += 1
+
+        self.count_expanded(expanded)
+
+        return min(area, limit)
+
+    def count_expanded(self, expanded):
+
+        self.expanded = expanded
+        self.total_expanded += expanded
+
+    def build_path(self, start, end):
+
+        '''
+        Reconstructs the path from start to end, using the parents of the last search
+        '''
+
+        path = []
+        node = end
+
+        while node != start:
+            path.append(self.cells[node])
+            node = self.parents[node]
+
+        path.reverse()
+
+        return path
+
+
+class AStarSearch(GridSearch):
+
+    '''
+    A* search with the Manhattan distance as heuristic. Between nodes with the
+    same estimated cost, the one closest to the end (smallest heuristic) goes first,
+    which avoids expanding every node of the same cost
+
+    ATTRIBUTES:
+
+        costs :     number of steps from the start to every cell visited in the last search
+        closed :    generation in which every cell was expanded for the last time
+    '''
+
+    def __init__(self, x_squares, y_squares):
+
+        super().__init__(x_squares, y_squares)
+
+        self.costs = [0] * (x_squares * y_squares)
+        self.closed = [0] * (x_squares * y_squares)
+
+    def find_path(self, start, end, occupancy, free_cell = -1):
+
+        self.generation += 1
+        generation = self.generation
+        visited, parents, costs, closed = self.visited, self.parents, self.costs, self.closed
+        neighbors, cells = self.neighbors, self.cells
+
+        end_x, end_y = cells[end]
+        expanded = 0
+
+        #Nodes ordered by (estimated cost, heuristic, insertion order)
+        heap = [(0, 0, 0, start)]
+        visited[start] = generation
+        costs[start] = 0
+        counter = 0
+
+        while heap:
+
+            _, _, _, node = heappop(heap)
+
+            if closed[node] == generation:
+                continue
+
+            if node == end:
+                self.count_expanded(expanded)
+                return self.build_path(start, end)
+
+            closed[node] = generation
+            expanded += 1
+            cost = costs[node] + 1
+
+            for next_node in neighbors[node]:
+
+                #Checking if the cell is free and we've found a shorter way to it
+                if (not occupancy[next_node] or next_node == free_cell) and (
+                    visited[next_node] != generation or cost < costs[next_node]):
+
+                    visited[next_node] = generation
+                    parents[next_node] = node
+                    costs[next_node] = cost
+
+                    x, y = cells[next_node]
+                    heuristic = abs(end_x - x) + abs(end_y - y)
+                    counter += 1
+                    heappush(heap, (cost + heuristic, heuristic, counter, next_node))
+
+        self.count_expanded(expanded)
+
+        return []
+
+
+class BidirectionalSearch(GridSearch):
+
+    '''
+    Breadth-First-Search from both ends at the same time. The smallest frontier is
+    expanded one whole level at a time until both searches meet
+
+    ATTRIBUTES:
+
+        back_visited :      generation in which every cell was visited by the backward search
+        back_parents :      next cell towards the end, for every cell visited by the backward search
+        distances :         number of steps to the start (forward) for every cell visited
+        back_distances :    number of steps to the end (backward) for every cell visited
+    '''
+
+    def __init__(self, x_squares, y_squares):
+
+        super().__init__(x_squares, y_squares)
+
+        self.back_visited = [0] * (x_squares * y_squares)
+        self.back_parents = [0] * (x_squares * y_squares)
+        self.distances = [0] * (x_squares * y_squares)
+        self.back_distances = [0] * (x_squares * y_squares)
+
+    def find_path(self, start, end, occupancy, free_cell = -1):
+
+        self.generation += 1
+        generation = self.generation
+
+        #The end must be a free cell
+        if start == end or (occupancy[end] and end != free_cell):
+            self.count_expanded(0)
+            return []
+
+        self.visited[start] = generation
+        self.distances[start] = 0
+        self.back_visited[end] = generation
+        self.back_distances[end] = 0
+
+        frontier, back_frontier = [start], [end]
+        expanded = 0
+        meeting = -1
+
+        while frontier and back_frontier and meeting < 0:
+
+            #Expanding the smallest frontier
+            if len(frontier) <= len(back_frontier):
+                expanded += len(frontier)
+                frontier, meeting = self.expand_level(frontier, occupancy, free_cell, self.visited, self.parents,
+                                    self.distances, self.back_visited, self.back_distances)
+
+            else:
+                expanded += len(back_frontier)
+                back_frontier, meeting = self.expand_level(back_frontier, occupancy, free_cell, self.back_visited,
+                                    self.back_parents, self.back_distances, self.visited, self.distances)
+
+        self.count_expanded(expanded)
+
+        if meeting < 0:
+            return []
+
+        #Path from the start to the meeting cell, and from there to the end
+        path = self.build_path(start, meeting)
+        node = meeting
+
+        while node != end:
+            node = self.back_parents[node]
+            path.append(self.cells[node])
+
+        return path
+
+    def expand_level(self, frontier, occupancy, free_cell, visited, parents, distances, other_visited, other_distances):
+
+        '''
+        Expands every node of a frontier (one side of the search)
+
+        RETURN : the next frontier and the best cell where both searches meet (-1 if they don't)
+        '''
+
+        generation = self.generation
+        next_frontier = []
+        meeting, meeting_distance = -1, None
+
+        for node in frontier:
+
+            distance = distances[node] + 1
+
+            for next_node in self.neighbors[node]:
+
+                if visited[next_node] != generation and (not occupancy[next_node] or next_node == free_cell):
+                    visited[next_node] = generation
+                    parents[next_node] = node
+                    distances[next_node] = distance
+                    next_frontier.append(next_node)
+
+                    #Both searches meet: the shortest total path is kept
+                    # once the whole level is expanded
+                    if other_visited[next_node] == generation and (
+                        meeting_distance is None or other_distances[next_node] < meeting_distance):
+                        meeting, meeting_distance = next_node, other_distances[next_node]
+
+        return next_frontier, meeting
+
+
+#Search strategies which can be used by the Pathfinder
+SEARCHES = {'bfs': GridSearch, 'astar': AStarSearch, 'bidirectional': BidirectionalSearch}
+
+
+class DistanceField(GridSearch):
+
+    '''
+    Distances and parents from a start cell to every reachable cell of the board,
+    computed with a single flood fill (a BFS without target). Once filled, the paths
+    to any number of cells are answered without searching again
+
+    ATTRIBUTES:
+
+        distances :     number of steps from the start to every cell reached in the last fill
+        start :         start cell (index) of the last fill
+
+    METHODS:
+
+        fill :          floods the free cells from a start cell
+        distance :      number of steps from the start to a cell (-1 if not reachable)
+        path_to :       shortest path from the start to a cell
+    '''
+
+    def __init__(self, x_squares, y_squares):
+
+        super().__init__(x_squares, y_squares)
+
+        self.distances = [0] * (x_squares * y_squares)
+        self.start = -1
+
+    def fill(self, start, occupancy, sink = -1):
+
+        '''
+        Floods every cell reachable from start (cell index), moving only
+        through cells with no blocks in the occupancy grid
+
+        sink : an occupied cell which gets a distance but isn't crossed (e.g. the snake tail)
+        '''
+
+        self.generation += 1
+        generation = self.generation
+        visited, parents, distances, neighbors = self.visited, self.parents, self.distances, self.neighbors
+
+        self.start = start
+        queue = deque((start,))
+        visited[start] = generation
+        distances[start] = 0
+        expanded = 0
+
+        while queue:
+
+            node = queue.popleft()
+            distance = distances[node] + 1
+            expanded += 1
+
+            for next_node in neighbors[node]:
+
+                if visited[next_node] != generation:
+
+                    #Free cell, the flood continues from here
+                    if not occupancy[next_node]:
+                        visited[next_node] = generation
+                        parents[next_node] = node
+                        distances[next_node] = distance
+                        queue.append(next_node)
+
+                    #Sink cell, reached but not crossed
+                    elif next_node == sink:
+                        visited[next_node] = generation
+                        parents[next_node] = node
+                        distances[next_node] = distance
+
+        self.count_expanded(expanded)
+
+    def distance(self, index):
+
+        if self.visited[index] != self.generation:
+            return -1
+
+        return self.distances[index]
+
+    def path_to(self, index):
+
+        '''
+        RETURN : a list of (x, y) cells from the first step to index, or [] if there's no path
+        '''
+
+        if index == self.start or self.visited[index] != self.generation:
+            return []
+
+        return self.build_path(self.start, index)
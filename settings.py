@@ -6,16 +6,24 @@ There are 5 variables, with 3 options each one, that can be changed by the user:
     Fruit_num : number of fruits to use in the game
     Map_color : color palette of the map
     Snake_color : color of the snake
+
+The pathfinder button switches the autopilot between NO, YES (BFS) and CYCLE (Hamiltonian cycle)
 '''
 
 import pygame as pg
 from button import Button
 from colors import COLORS
+from assets import ASSETS
 
 pg.init()
 settings_font = pg.font.SysFont('comicsans', 45)
 pathfinder_font = pg.font.SysFont('comicsans', 30)
 
+#Variables and their possible values
+OPTIONS = {'Snake Vel.': ['FAST', 'NORMAL', 'SLOW'],
+'Map Size': ['BIG', 'MEDIUM', 'SMALL'], 'Fruit Num.': ['THREE', 'TWO', 'ONE'],
+'Map Color': ['RED_MAP', 'GREEN_MAP', 'BLUE_MAP'], 'Snake Color': ['YELLOW', 'RED', 'BLUE']}
+
 class Settings:
 
     '''
@@ -34,6 +42,10 @@ class Settings:
         PATHFINDER_button :    button object associated with PATHFINDER_IMAGE
         settings_button :      button object associated with SETTINGS_IMAGE
         option_rects :         a list to store the rectangle objects associated with the options
+        option_images :        image of every option (same order as option_rects), already scaled
+        labels :               (text surface, position) of the name of every variable
+        pathfinder_labels :    text surfaces of the pathfinder button: 'Pathfinder', 'BFS' and 'Cycle'
+        pathfinder_rect :      rectangle around the pathfinder button
         clicked :              a list to store the options that have been clicked
 
     METHODS:
@@ -42,6 +54,7 @@ class Settings:
         draw_lines :        draws lines around a rect. object
         draw_sep_lines :    draws lines separating the differents options
         draw_options :      displays an image associated with every option
+        load_options :      loads the images and texts of the menu and computes their positions (only once)
         check_options :     calls draw_menu and cheks which options have been clicked
         get_options :       returns a list of the clicked options
 
@@ -52,14 +65,19 @@ class Settings:
         self.x = 500
         self.y = 480
         self.rect = pg.Rect(100, 100, self.x, self.y)
-        self.SETTINGS_IMAGE = pg.transform.scale(pg.image.load('images/settings.png'), (60, 60))
-        self.CLOSE_IMAGE = pg.transform.scale(pg.image.load('images/settings_images/CLOSE.png'), (35, 35))
-        self.PATHFINDER_IMAGE = pg.transform.scale(pg.image.load('images/settings_images/pathfinder.png'), (26, 26))
+        self.SETTINGS_IMAGE = ASSETS.image('images/settings.png', (60, 60))
+        self.CLOSE_IMAGE = ASSETS.image('images/settings_images/CLOSE.png', (35, 35))
+        self.PATHFINDER_IMAGE = ASSETS.image('images/settings_images/pathfinder.png', (26, 26))
         self.close_button = Button(self.CLOSE_IMAGE)
         self.pathfinder_button = Button(self.PATHFINDER_IMAGE)
         self.settings_button = Button(self.SETTINGS_IMAGE)
-        self.option_rects = []
-        self.clicked = [0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 1, 0, 0, 1]
+        self.clicked = [0, 1, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0]
+
+        self.load_options()
+
+        #Positions of the buttons don't change
+        self.close_button.set_pos(self.rect.topright[0] - 42, self.rect.top + 40)
+        self.pathfinder_button.set_pos(self.pathfinder_rect.left + 5, self.rect.top + 35)
 
     def draw_menu(self, WINDOW):
         pg.draw.rect(WINDOW, COLORS['LIGHT_BLUE'], self.rect)
@@ -91,37 +109,55 @@ class Settings:
     
     def draw_options(self, WINDOW):
 
-        #Variables and their possible values
-        options = {'Snake Vel.': ['FAST', 'NORMAL', 'SLOW'], 
-        'Map Size': ['BIG', 'MEDIUM', 'SMALL'], 'Fruit Num.': ['THREE', 'TWO', 'ONE'],
-        'Map Color': ['RED_MAP', 'GREEN_MAP', 'BLUE_MAP'], 'Snake Color': ['YELLOW', 'RED', 'BLUE']}
+        #Displaying the name of the different variables
+        for label_surface, label_pos in self.labels:
+            WINDOW.blit(label_surface, label_pos)
+
+        #Displaying the image of every option over a white square
+        for rect_ij, OPTION_IMAGE in zip(self.option_rects, self.option_images):
+            pg.draw.rect(WINDOW, COLORS['WHITE'], rect_ij)
+            WINDOW.blit(OPTION_IMAGE, rect_ij)
 
-        for i, key in enumerate(options):
+    def load_options(self):
 
-            #Separations between two consecutives variables
-            separation = (self.rect.bottom - self.rect.top - 40) / 5
+        '''
+        Takes the (scaled) images of the options from ASSETS and renders the texts of the
+        menu once, and computes where they go. The menu doesn't move, so drawing it
+        only takes a few blits per frame
+        '''
 
-            #Displaying the name of the different variables
+        self.option_rects = []
+        self.option_images = []
+        self.labels = []
+
+        #Separations between two consecutives variables
+        separation = (self.rect.bottom - self.rect.top - 40) / 5
+
+        for i, key in enumerate(OPTIONS):
+
+            #Name of the variable
             x_option = self.rect.left + 10
             y_option = self.rect.top + 50 + i*separation
             option_surface = settings_font.render(f'{key}', 1, COLORS['BLACK'])
-            WINDOW.blit(option_surface, (x_option, y_option))
+            self.labels.append((option_surface, (x_option, y_option)))
 
             #Iterating through the different values of every variables
-            for j, option in enumerate(options[key]):
+            for j, option in enumerate(OPTIONS[key]):
 
                 option_sep = 70  #Separation between every option
 
                 #Rectangle associated with the option
                 rect_ij = pg.Rect(self.rect.right - option_sep*(j + 1), y_option + 10, 55, 55)
-                pg.draw.rect(WINDOW, COLORS['WHITE'], rect_ij)
                 self.option_rects.append(rect_ij)
 
                 #Image associated with the option
-                OPTION_IMAGE = pg.transform.scale(pg.image.load(f'images/settings_images/{option}.png'), (55, 55))
+                OPTION_IMAGE = ASSETS.image(f'images/settings_images/{option}.png', (55, 55))
+                self.option_images.append(OPTION_IMAGE)
 
-                option_rect = pg.Rect(rect_ij.x, rect_ij.y, 55, 55)
-                WINDOW.blit(OPTION_IMAGE, option_rect)
+        #Pathfinder button
+        self.pathfinder_labels = {text: pathfinder_font.render(text, 1, COLORS['BLACK'])
+                                  for text in ('Pathfinder', 'BFS', 'Cycle')}
+        self.pathfinder_rect = pg.Rect(self.rect.left + 170, self.rect.top - 30 + 35, 35, 35)
 
 
     def check_option(self, WINDOW):
@@ -131,23 +167,22 @@ class Settings:
         '''
 
         #Drawing the menu
-        self.option_rects = []
         self.draw_menu(WINDOW)
 
         #Drawing the close button
-        self.close_button.set_pos(self.rect.topright[0] - 42, self.rect.top + 40)
         close_options = self.close_button.draw(WINDOW)
 
         #Drawing the pathfinder button
-        pathfinder_surface = pathfinder_font.render('Pathfinder', 1, COLORS['BLACK'])
-        WINDOW.blit(pathfinder_surface, (self.rect.left + 10, self.rect.top - 2))
-        pathfinder_rect = pg.Rect(self.rect.left + 170, self.rect.top - 30 + 35, 35, 35)
-        self.pathfinder_button.set_pos(pathfinder_rect.left + 5, self.rect.top + 35)
+        pathfinder_rect = self.pathfinder_rect
+        WINDOW.blit(self.pathfinder_labels['Pathfinder'], (self.rect.left + 10, self.rect.top - 2))
         pathdfinder_option = self.pathfinder_button.draw(WINDOW)
 
-        if self.clicked[-2]:
+        #Pathfinder options: YES (BFS), NO and CYCLE (Hamiltonian cycle)
+        if self.clicked[-3] or self.clicked[-1]:
             self.draw_lines(WINDOW, pathfinder_rect, 'BLACK')
-        
+            strategy_surface = self.pathfinder_labels['BFS' if self.clicked[-3] else 'Cycle']
+            WINDOW.blit(strategy_surface, (pathfinder_rect.right + 10, self.rect.top - 2))
+
         else:
             self.draw_lines(WINDOW, pathfinder_rect, 'LIGHT_GREY')
 
@@ -179,8 +214,9 @@ class Settings:
             else:
                 self.draw_lines(WINDOW, option, 'LIGHT_GREY')
 
+        #Changing the pathfinder option: NO -> YES -> CYCLE -> NO
         if pathdfinder_option:
-            self.clicked[-1], self.clicked[-2] = self.clicked[-2], self.clicked[-1]
+            self.clicked[-3], self.clicked[-2], self.clicked[-1] = self.clicked[-2], self.clicked[-1], self.clicked[-3]
 
         if close_options:
             return True
@@ -199,7 +235,7 @@ class Settings:
 
         options = ['FAST', 'NORMAL', 'SLOW', 'BIG', 'MEDIUM', 'SMALL',
         'THREE', 'TWO', 'ONE', 'RED_MAP', 'GREEN_MAP', 'BLUE_MAP', 
-        'YELLOW', 'RED', 'BLUE', 'YES', 'NO']
+        'YELLOW', 'RED', 'BLUE', 'YES', 'NO', 'CYCLE']
 
         return [option for i, option in enumerate(options) if self.clicked[i] == 1]
 
@@ -0,0 +1,128 @@
+'''
+Plays autopilot games without any display, using the headless Engine and the
+Pathfinder. Nothing is drawn and nothing sleeps, so the games run as fast as the
+pathfinder allows.
+
+    python simulate.py --games 100 --size MEDIUM --fruits 1 --strategy bfs --search astar --decision-cache 4096 --budget 2
+'''
+
+import argparse
+import time
+
+from engine import Engine, BOARD_SIZES
+from pathfinder import Pathfinder
+from hamiltonian import HamiltonianPathfinder
+from search import SEARCHES
+
+#Autopilot strategies
+PATHFINDERS = {'bfs': Pathfinder, 'cycle': HamiltonianPathfinder}
+
+
+def play_game(x_squares, y_squares, num_fruits = 1, max_moves = None, strategy = 'bfs', search = 'bfs',
+              decision_cache_size = 4096, time_budget = None):
+
+    '''
+    Plays a whole autopilot game and returns the Engine and the pathfinder at the end of it
+
+    strategy : autopilot used (a key of PATHFINDERS)
+    search : search strategy of the bfs autopilot (a key of SEARCHES)
+    decision_cache_size : size of the LRU cache of plans of the bfs autopilot (0 to disable it)
+    time_budget : max. time (milliseconds) of every new plan of the bfs autopilot (default: no limit)
+    max_moves : stops the game after this number of moves (default: 100 times the number of cells)
+    '''
+
+    if max_moves is None:
+        max_moves = 100 * x_squares * y_squares
+
+    engine = Engine(x_squares, y_squares, num_fruits)
+    if strategy == 'bfs':
+        pathfinder = Pathfinder(x_squares, y_squares, search, decision_cache_size, time_budget)
+
+    else:
+        pathfinder = PATHFINDERS[strategy](x_squares, y_squares)
+    x_dir, y_dir = 1, 0
+
+    while engine.playing and engine.moves < max_moves:
+
+        path = pathfinder.get_path(engine.snake, engine.fruit)
+
+        if path:
+
+            #Directions to move the snake to the neighbor location
+            x_dir = path[0][0] - engine.snake.head[0]
+            y_dir = path[0][1] - engine.snake.head[1]
+
+        engine.snake.direction = (x_dir, y_dir)
+        engine.step()
+
+    return engine, pathfinder
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description = 'Plays autopilot games without display')
+    parser.add_argument('--games', type = int, default = 10)
+    parser.add_argument('--size', choices = list(BOARD_SIZES), default = 'MEDIUM')
+    parser.add_argument('--fruits', type = int, choices = [1, 2, 3], default = 1)
+    parser.add_argument('--strategy', choices = list(PATHFINDERS), default = 'bfs')
+    parser.add_argument('--search', choices = list(SEARCHES), default = 'bfs')
+    parser.add_argument('--decision-cache', type = int, default = 4096)
+    parser.add_argument('--budget', type = float, default = None, help = 'time budget of every plan (ms)')
+    args = parser.parse_args()
+
+    x_squares, y_squares = BOARD_SIZES[args.size]
+    scores, wins, moves, plan_hits, plan_misses = [], 0, 0, 0, 0
+    search_expanded, field_expanded = 0, 0
+    decision_hits, decision_misses, decision_evictions = 0, 0, 0
+    depth_counts = None
+
+    start = time.perf_counter()
+
+    for _ in range(args.games):
+        engine, pathfinder = play_game(x_squares, y_squares, args.fruits, strategy = args.strategy,
+                                       search = args.search, decision_cache_size = args.decision_cache,
+                                       time_budget = args.budget)
+        scores.append(len(engine.snake.cells) - 3)
+        wins += engine.won
+        moves += engine.moves
+
+        if hasattr(pathfinder, 'expanded_nodes'):
+            search_nodes, field_nodes = pathfinder.expanded_nodes()
+            search_expanded += search_nodes
+            field_expanded += field_nodes
+
+        if hasattr(pathfinder, 'plan_hits'):
+            plan_hits += pathfinder.plan_hits
+            plan_misses += pathfinder.plan_misses
+            decision_hits += pathfinder.decision_hits
+            decision_misses += pathfinder.decision_misses
+            decision_evictions += pathfinder.decision_evictions
+
+            if pathfinder.time_budget is not None:
+                depth_counts = depth_counts or [0] * len(pathfinder.depth_counts)
+                depth_counts = [total + count for total, count in zip(depth_counts, pathfinder.depth_counts)]
+
+    elapsed = time.perf_counter() - start
+
+    strategy = f'{args.strategy} ({args.search} search)' if args.strategy == 'bfs' else args.strategy
+    print(f'{args.games} {strategy} games on {args.size} ({x_squares}x{y_squares}), {args.fruits} fruit(s)')
+    print(f'mean score: {sum(scores) / len(scores):.1f}   max score: {max(scores)}   wins: {wins}')
+    print(f'moves: {moves}   time: {elapsed:.2f} s   games/s: {args.games / elapsed:.2f}   moves/s: {moves / elapsed:.0f}')
+
+    if search_expanded + field_expanded:
+        print(f'expanded nodes per move: {search_expanded / moves:.1f} by the {args.search} searches   '
+              f'{field_expanded / moves:.1f} by the distance fields (BFS)')
+
+    if plan_hits + plan_misses:
+        print(f'plan cache: {plan_hits} hits   {plan_misses} misses   hit rate: {plan_hits / (plan_hits + plan_misses):.1%}')
+
+    if decision_hits + decision_misses:
+        print(f'decision cache: {decision_hits} hits   {decision_misses} misses   {decision_evictions} evictions   '
+              f'hit rate: {decision_hits / (decision_hits + decision_misses):.1%}')
+
+    if depth_counts:
+        print('plans by lookahead depth reached: ' + '   '.join(f'{depth}: {count}' for depth, count in enumerate(depth_counts)))
+
+
+if __name__ == '__main__':
+    main()
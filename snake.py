@@ -1,205 +1,162 @@
 import pygame as pg
-from pygame.math import Vector2
 from colors import COLORS
+from engine import SnakeState
+from assets import ASSETS
 
-class Snake:
+class Snake(SnakeState):
 
-    ''' Class to store snake instances. The snake body is considered to be constituted by a set of squares (blocks)
+    ''' Class to store snake instances. The snake body is considered to be constituted by a set of squares (blocks).
+    The motion rules are inherited from SnakeState (engine.py), this class only adds the assets and the drawing
 
     ATTRIBUTES:
 
-        body :                  list containing the position of each individual block of the snake
         CELL_WIDTH :            length of an individual square of the grid
         block_size :            length of an individual block of the snake (with respect to CELL_WIDTH)
-        direction :             current direction of the snake head
-        new_direction :         next direction of the snake head (provided by the user)
-        directions :            list of current directions for every snake's body piece7
-        tail_direction :        a vector in the direction of the motion of the snake tail
-        increase_body :         boolean to know whether increase the snake body or not
-        new_block :             stores the position where to insert the new body block
-        new_block_move :        boolean to know when to start moving new_block
-        moves_wihout_eating :   the number of cells that snake has moved without eating
-        is_virtual_snake :      a boolean to know whether the snake is virtual
         snake_color :           snake color
-        cell_division :         number of steps needed to move from one square to another
-        iterations :            number of steps taken from the last cell       
+        cell_division :         number of frames per cell of the speed options (FAST = 85 is 8.5 cells per second)
+        progress :              fraction of the way (0 to 1) drawn from the last cell of every block to the current one
         EYES :                  image to display the snake eyes
+        EYES_BY_DIRECTION :     image of the eyes for every direction of the head (rotated once per cell size, see ASSETS)
+        BLOCK :                 sprite of a square of the snake body
         hit_sound :             game sound
         eating_sound :          game sound
 
     METHODS:
 
-        draw_snake :                    displays the snake body using squares
-        draw_intermediate_squares :     draws squares between the gaps of every block of the snake body
-        move_snake :                    moves the snake body (and adds a new block when needed)
-        body_block_directions :         computes the directions attribute 
+        block_positions :               computes the position of every block between the last cell and the next one
+        draw_snake :                    displays the snake body using squares (a single batch of blits)
+        gap_squares :                   computes the positions of the squares between the gaps of every block of the snake body
+        changing_cells :                returns the groups of cells where the drawing of the snake changes between two cells
     '''
 
-    def __init__(self, color, cell_width, virtual_snake = False):
+    def __init__(self, color, cell_width, x_squares, y_squares):
+
+        super().__init__(x_squares, y_squares)
 
-        self.body = [Vector2(5,4),Vector2(4,4),Vector2(3,4)]
         self.CELL_WIDTH = cell_width
         self.block_size = int(0.8 * self.CELL_WIDTH)
 
-        self.direction = Vector2(0,0)
-        self.new_direction = Vector2(0,0)
-        self.directions = [0, 0 , 0]
-        self.tail_direction = Vector2(1,0)
-
-        self.increase_body = False
-        self.new_block_move = False
-        self.new_block = Vector2(0,0)
-       
-        self.moves_without_eating = 0
-        self.is_virtual_snake = virtual_snake
-
         self.snake_color = color
 
+        #The snake starts at the centre of a cell
         self.cell_division = 10
-        self.iterations = 0
+        self.progress = 1
 
-        self.EYES = pg.transform.scale(pg.transform.rotate(
-            pg.image.load('images/snake_eyes.png'), 90), (0.8*self.CELL_WIDTH, 0.8*self.CELL_WIDTH))
+        self.EYES = ASSETS.image('images/snake_eyes.png', (0.8*self.CELL_WIDTH, 0.8*self.CELL_WIDTH), 90)
 
-        self.hit_sound = pg.mixer.Sound('sounds/hit.wav')
-        self.eating_sound = pg.mixer.Sound('sounds/eating.wav')
+        #The eyes are rotated when the snake moves vertically
+        EYES_VERTICAL = ASSETS.image('images/snake_eyes.png', (0.8*self.CELL_WIDTH, 0.8*self.CELL_WIDTH), 180)
+        self.EYES_BY_DIRECTION = {(1, 0): self.EYES, (-1, 0): self.EYES, (0, 1): EYES_VERTICAL, (0, -1): EYES_VERTICAL}
 
-    def draw_snake(self, WINDOW, coordinate_transform, args):
+        self.BLOCK = pg.Surface((self.block_size, self.block_size)).convert()
+        self.BLOCK.fill(COLORS[self.snake_color])
 
-        #Displaying a square at the center of the cell (x, y) for
-        # every 'block' in the snake body
-        for i, body_block in enumerate(self.body):
+        self.hit_sound = ASSETS.sound('sounds/hit.wav')
+        self.eating_sound = ASSETS.sound('sounds/eating.wav')
 
-            #x,y pixel position on the game board
-            x = int(body_block.x * self.CELL_WIDTH  + 0.5 * (self.CELL_WIDTH - self.block_size))
-            y = int(body_block.y * self.CELL_WIDTH + 0.5 * (self.CELL_WIDTH - self.block_size))
+    def block_positions(self):
 
-            x, y = coordinate_transform(x, y, args)
-            body_rect = pg.Rect(x, y, self.block_size, self.block_size)
-        
-            pg.draw.rect(WINDOW, COLORS[self.snake_color], body_rect)
+        '''
+        Computes the (x, y) position of every block of the snake body.
+
+        EXTRA COMMENTS : the logical snake moves one whole cell at a time. In order to make the motion
+            more continuous every block is drawn between its previous cell (the cell of the next
+            block, or self.last_tail for the tail) and its current cell, at self.progress of the way
+            (the time since the last move, see Game.update).
+        '''
 
-            if i != 0:
-                
-                #Filling the gaps between every square
-                self.draw_intermediate_squares(WINDOW, i, 2, coordinate_transform, args)
+        t = self.progress
+        positions = []
 
-        # x,y pixel position for the snake eyes (game board)   
-        x_eyes = int(self.body[0].x * self.CELL_WIDTH  + 0.5 * (self.CELL_WIDTH - self.block_size))
-        y_eyes = int(self.body[0].y * self.CELL_WIDTH + 0.5 * (self.CELL_WIDTH - self.block_size))
+        #Previous cell of every block: the cell of the next block, and
+        # self.last_tail for the tail
+        prev_cells = iter(self.cells)
+        next(prev_cells)
 
-        x_eyes, y_eyes = coordinate_transform(x_eyes, y_eyes, args)
+        for cell in self.cells:
 
-        eyes_rect = pg.Rect(x_eyes, y_eyes, self.CELL_WIDTH, self.CELL_WIDTH)
+            x, y = self.coords[cell]
+            prev_x, prev_y = self.coords[next(prev_cells, self.last_tail)]
+            positions.append((prev_x + (x - prev_x) * t, prev_y + (y - prev_y) * t))
 
-        #Rotating EYES image when necessary
-        if self.direction.y != 0:
-             WINDOW.blit(pg.transform.rotate(self.EYES, 90), eyes_rect)
-            
-        else:
-            WINDOW.blit(self.EYES, eyes_rect)
+        return positions
 
-    def draw_intermediate_squares(self, WINDOW, i, squares, coordinate_transform, args):
+    def changing_cells(self):
 
         '''
-        Fills the gaps between squares of the snake body displaying squares
+        Groups of (x, y) cells where the snake drawing changes while the blocks move
+        from their last cell to the next one (see block_positions). Anywhere else the
+        body is a straight line of squares that looks the same at every step.
 
-        i : index of the block in the snake body
-        squares : number of squares to draw between the gap
-        
+        The groups are the head (with its last cell), the tail (with the cell it leaves
+        and the next block) and every corner of the body (with the cells around it)
+
+        RETURN : a list of tuples of (x, y) cells
         '''
 
-        #x, y coordinate of the current block (i) and the next one (i-1)
-        x_current = int(self.body[i].x * self.CELL_WIDTH  + 0.5 * (self.CELL_WIDTH - self.block_size))
-        x_next = int(self.body[i-1].x * self.CELL_WIDTH  + 0.5 * (self.CELL_WIDTH - self.block_size))
-        y_current = int(self.body[i].y * self.CELL_WIDTH + 0.5 * (self.CELL_WIDTH - self.block_size))
-        y_next = int(self.body[i-1].y * self.CELL_WIDTH + 0.5 * (self.CELL_WIDTH - self.block_size))
+        cells, coords = self.cells, self.coords
 
-        #Dividing the the line from (x_current, y_current) to (x_next, y_next)
-        #into  equal segments
-        for j in range(1, squares + 1):
+        groups = [(coords[cells[0]], coords[cells[1]])]
+        groups.append((coords[self.last_tail], coords[cells[-1]], coords[cells[-2]]))
 
-            xj = j*x_current / (squares + 1) + (squares + 1 - j)*x_next / (squares + 1)
-            yj = j*y_current / (squares + 1) + (squares + 1 - j)*y_next / (squares + 1)
+        #The squares between two blocks cut the corners, so they change at every step
+        for i in range(1, len(cells) - 1):
+            next_cell, cell, prev_cell = cells[i - 1], cells[i], cells[i + 1]
 
-            xj, yj = coordinate_transform(xj, yj, args)
+            if next_cell - cell != cell - prev_cell:
+                groups.append((coords[next_cell], coords[cell], coords[prev_cell]))
 
-            body_rect1 = pg.Rect(xj, yj, self.block_size, self.block_size)
-            pg.draw.rect(WINDOW, COLORS[self.snake_color], body_rect1)
+        return groups
 
-    
-    def move_snake(self):
+    def draw_snake(self, WINDOW, layout):
 
         '''
-        Moves the body of the snake using self.directions
-        If self.increase_body is True, add a new block
-        
-
-        EXTRA COMMENTS : the snake (head) can only move to a new direction when 
-            it's located exactly at the centre of the cell. When the snake (head) is
-            at the centre, we check for new directions.
-            
-            In order to make the motion
-            more continuous we divide each cell into a number of divisions (self.cell_division) and we
-            increase the position by 1/self.cell_division every iteration.
-        '''
-        #Snake (head) not at the centre of the cell
-
-        if self.is_virtual_snake:
-            if self.increase_body == True:
-                body_copy = self.body[:]
-                body_copy.insert(0, body_copy[0] + self.direction)
-                self.body = body_copy[:]
-                self.increase_body = False
+        Displays a square at the centre of the cell (x, y) for every 'block' in the snake
+        body, and two more squares to fill the gap between every two blocks. Every square
+        is a blit of the same sprite, so the whole body is drawn with a single Surface.blits call
 
-            else:
-                tail_prev_pos = self.body[-1]
-                body_copy = self.body[:-1]
-                body_copy.insert(0,body_copy[0] + self.direction)
-                self.body = body_copy[:]
-                tail_new_pos = self.body[-1]
-                self.tail_direction = tail_new_pos - tail_prev_pos
+        layout : BoardLayout object with the position of the board in the window
+        '''
 
-        else:
-            if self.iterations < self.cell_division:
-                for i in range(len(self.body)):
-                    self.body[i] += self.directions[i] / self.cell_division
+        positions = self.block_positions()
 
-                self.iterations += 1
+        #Translation from the game board to the window (the same for every block)
+        delta_x, delta_y = layout.delta_x, layout.delta_y
+        offset = 0.5 * (self.CELL_WIDTH - self.block_size)
 
-            #Snake (head) exactly at the centre of the cell
-            else:
+        #x,y pixel position of every block on the game board
+        pixels = [(int(x * self.CELL_WIDTH + offset), int(y * self.CELL_WIDTH + offset)) for x, y in positions]
 
-                #Checking if we have to increase the body
-                if self.increase_body == True:
-                    if self.new_block_move == True:
-                        self.body.append(self.new_block)
-                        self.increase_body = False
-                        self.new_block_move = False
+        sprites = [(self.BLOCK, (int(x + delta_x), int(y + delta_y))) for x, y in pixels]
+        sprites += [(self.BLOCK, (int(x + delta_x), int(y + delta_y))) for x, y in self.gap_squares(pixels, 2)]
 
-                    self.new_block_move = True
+        WINDOW.blits(sprites, doreturn = False)
 
-                self.direction = self.new_direction
-                self.body_block_direction()
-                self.iterations = 0
-                self.move_snake()
+        #Eyes in the direction of the head
+        x_eyes, y_eyes = pixels[0]
+        WINDOW.blit(self.EYES_BY_DIRECTION.get(self.direction, self.EYES), (int(x_eyes + delta_x), int(y_eyes + delta_y)))
 
-    def body_block_direction(self):
+    def gap_squares(self, pixels, squares):
 
         '''
-        Used to compute self.directions
-        '''
+        Positions of the squares that fill the gaps between the squares of the snake body
 
-        directions = [0 for _ in range(len(self.body))]
+        pixels : x, y pixel position (game board) of every block
+        squares : number of squares to draw between every two blocks
 
-        directions[0] = self.direction
+        RETURN : list of x, y pixel positions (game board)
+        '''
 
-        for i in range(1, len(self.body)):
+        gaps = []
 
-            #Since the distance between every block is constant,
-            #we can calculate the direction of motion as a subtraction
-            directions[i] = self.body[i-1] - self.body[i]
+        #Dividing the the line from every block (x_current, y_current) to
+        # the next one (x_next, y_next) into equal segments
+        for (x_next, y_next), (x_current, y_current) in zip(pixels, pixels[1:]):
+            for j in range(1, squares + 1):
 
-        self.directions = directions
+                xj = j*x_current / (squares + 1) + (squares + 1 - j)*x_next / (squares + 1)
+                yj = j*y_current / (squares + 1) + (squares + 1 - j)*y_next / (squares + 1)
 
+                gaps.append((xj, yj))
 
+        return gaps
@@ -0,0 +1,121 @@
+'''
+Checks of the state kept up to date by the Engine on every step (engine.py),
+against the same state computed from scratch, along seeded autopilot games.
+PlanningSnake.after_path is checked against moving the snake step by step.
+
+    python -m pytest test_engine.py
+'''
+
+import random
+
+from engine import Engine, PlanningSnake, BOARD_SIZES
+from pathfinder import Pathfinder
+
+
+def autopilot_steps(x_squares, y_squares, num_fruits, seed, max_moves = 2000):
+
+    '''
+    Plays an autopilot game (as in simulate.py) and yields the Engine after every step
+    '''
+
+    random.seed(seed)
+    engine = Engine(x_squares, y_squares, num_fruits)
+    pathfinder = Pathfinder(x_squares, y_squares)
+
+    yield engine
+
+    while engine.playing and engine.moves < max_moves:
+
+        path = pathfinder.get_path(engine.snake, engine.fruit)
+        if path:
+            engine.snake.direction = (path[0][0] - engine.snake.head[0], path[0][1] - engine.snake.head[1])
+
+        engine.step()
+
+        yield engine
+
+
+def games():
+
+    #Every board size and number of fruits
+    for seed, size in enumerate(BOARD_SIZES):
+        for num_fruits in (1, 3):
+            yield BOARD_SIZES[size] + (num_fruits, seed)
+
+
+def test_free_cells_match_board():
+
+    for x_squares, y_squares, num_fruits, seed in games():
+        for engine in autopilot_steps(x_squares, y_squares, num_fruits, seed):
+
+            fruit_cells = {x + y * x_squares for x, y in engine.fruit.positions}
+            expected = {cell for cell in range(x_squares * y_squares)
+                        if not engine.snake.occupancy[cell] and cell not in fruit_cells}
+
+            free_cells = engine.free_cells
+            assert len(free_cells.cells) == len(set(free_cells.cells))
+            assert set(free_cells.cells) == expected
+            assert all(free_cells.cells[free_cells.slots[cell]] == cell for cell in expected)
+            assert all(free_cells.slots[cell] == -1 for cell in range(x_squares * y_squares) if cell not in expected)
+
+
+def test_incremental_zobrist_matches_hash():
+
+    for x_squares, y_squares, num_fruits, seed in games():
+        for engine in autopilot_steps(x_squares, y_squares, num_fruits, seed):
+
+            assert engine.snake.zobrist == engine.snake.body_hash()
+
+            fruit_hash = 0
+            for fruit_pos in engine.fruit.positions:
+                fruit_hash ^= engine.fruit.fruit_key(fruit_pos)
+
+            assert engine.fruit.zobrist == fruit_hash
+
+
+def random_walk(snake, steps, generator):
+
+    #Cells (x, y) visited by moving the head to random neighbors inside the board
+    path, (x, y) = [], snake.head
+
+    for _ in range(steps):
+        x, y = generator.choice([(x + dx, y + dy) for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                                 if 0 <= x + dx < snake.x_squares and 0 <= y + dy < snake.y_squares])
+        path.append((x, y))
+
+    return path
+
+
+def test_after_path_matches_moves():
+
+    generator = random.Random(0)
+
+    for _ in range(2000):
+
+        x_squares, y_squares = generator.choice(list(BOARD_SIZES.values()))
+        snake = PlanningSnake(x_squares, y_squares, [(5, 4), (4, 4), (3, 4)])
+
+        for x, y in random_walk(snake, generator.randrange(20), generator):
+            snake.direction = (x - snake.head[0], y - snake.head[1])
+            snake.increase_body = generator.random() < 0.3
+            snake.move_snake()
+
+        path = random_walk(snake, generator.randrange(1, 30), generator)
+
+        #The snake grows on some steps, always including the last one
+        growth = generator.randrange(min(len(path), 4) + 1)
+        growing_steps = set(generator.sample(range(len(path) - 1), growth - 1)) | {len(path) - 1} if growth else set()
+
+        expected = snake.copy()
+        for step, (x, y) in enumerate(path):
+            expected.direction = (x - expected.head[0], y - expected.head[1])
+            expected.increase_body = step in growing_steps
+            expected.move_snake()
+
+        result = snake.after_path(path, growth)
+
+        assert result.cells == expected.cells
+        assert result.occupancy == expected.occupancy
+        assert result.last_tail == expected.last_tail
+        assert result.direction == expected.direction
+        assert result.zobrist == expected.zobrist
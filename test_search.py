@@ -0,0 +1,128 @@
+'''
+Checks of the search engines (search.py) against the BFS of the original pathfinder,
+on random boards.
+
+    python -m pytest test_search.py
+'''
+
+from random import Random
+
+from search import GridSearch, AStarSearch, BidirectionalSearch
+
+#Board sizes of the game (see BOARD_SIZES in engine.py) and a few odd ones
+SIZES = [(19, 17), (12, 11), (8, 8), (5, 3), (1, 6)]
+
+
+def old_breadth_first_search(x_squares, y_squares, start_pos, end_pos, snake_body):
+
+    '''
+    Breadth-First-Search of the original Pathfinder (before search.py), with
+    (x, y) cells and the body of the snake as a list of occupied cells
+    '''
+
+    cells = [(i, j) for i in range(x_squares) for j in range(y_squares)]
+    visited = {pos: False for pos in cells}
+    parent_nodes = {pos: None for pos in cells}
+
+    queue = [start_pos]
+    visited[start_pos] = True
+
+    while queue:
+
+        node = queue.pop(0)
+
+        for next_node in [(node[0] + 1, node[1]), (node[0] - 1, node[1]), (node[0], node[1] + 1), (node[0], node[1] - 1)]:
+
+            if (0 <= next_node[0] < x_squares and 0 <= next_node[1] < y_squares and
+                    next_node not in snake_body and not visited[next_node]):
+                queue.append(next_node)
+                visited[next_node] = True
+                parent_nodes[next_node] = node
+
+    #Reconstructing the path
+    path = []
+    parent_node = end_pos
+
+    while True:
+
+        if parent_nodes[parent_node] is None:
+            return []
+
+        parent_node = parent_nodes[parent_node]
+
+        if parent_node == start_pos:
+            path.append(end_pos)
+            return path
+
+        path.insert(0, parent_node)
+
+
+def random_states(number_of_states, seed = 0):
+
+    '''
+    Yields (x_squares, y_squares, occupancy, start, end) with random blocked cells
+    (up to 40% of the board) and random start and end cells
+    '''
+
+    generator = Random(seed)
+
+    for _ in range(number_of_states):
+
+        x_squares, y_squares = generator.choice(SIZES)
+        cells = x_squares * y_squares
+
+        occupancy = bytearray(cells)
+        for cell in generator.sample(range(cells), generator.randrange(int(0.4 * cells) + 1)):
+            occupancy[cell] = 1
+
+        start, end = generator.randrange(cells), generator.randrange(cells)
+
+        yield x_squares, y_squares, occupancy, start, end
+
+
+def is_valid_path(search, start, end, occupancy, path):
+
+    #Every step goes to a free neighbor, and the path finishes at end
+    cells = [start] + [search.index(cell) for cell in path]
+
+    return cells[-1] == end and all(next_cell in search.neighbors[cell] and not occupancy[next_cell]
+                                    for cell, next_cell in zip(cells, cells[1:]))
+
+
+def test_grid_search_matches_old_bfs():
+
+    for x_squares, y_squares, occupancy, start, end in random_states(3000):
+
+        search = GridSearch(x_squares, y_squares)
+        body = [search.cells[cell] for cell in range(x_squares * y_squares) if occupancy[cell]]
+
+        expected = old_breadth_first_search(x_squares, y_squares, search.cells[start], search.cells[end], body)
+
+        assert search.find_path(start, end, occupancy) == expected
+
+
+def test_free_cell_is_crossed():
+
+    #A blocked cell can be used as free_cell (e.g. the tail of the snake)
+    search = GridSearch(5, 1)
+    occupancy = bytearray([0, 0, 1, 0, 0])
+
+    assert search.find_path(0, 4, occupancy) == []
+    assert search.find_path(0, 4, occupancy, free_cell = 2) == [(1, 0), (2, 0), (3, 0), (4, 0)]
+
+
+def test_strategies_find_shortest_paths():
+
+    for x_squares, y_squares, occupancy, start, end in random_states(3000, seed = 1):
+
+        bfs = GridSearch(x_squares, y_squares).find_path(start, end, occupancy)
+
+        for strategy in (AStarSearch, BidirectionalSearch):
+
+            search = strategy(x_squares, y_squares)
+            path = search.find_path(start, end, occupancy)
+
+            assert len(path) == len(bfs)
+
+            if path:
+                assert is_valid_path(search, start, end, occupancy, path)